@@ -1,15 +1,240 @@
-import httpx
+import asyncio
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
+from fastapi import HTTPException, status
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+# "gemini", or "fake" for local development and tests
+AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini")
+# Provider calls in flight at once across the process; further calls wait for a slot
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+# Seconds allowed for one call, including the wait for a slot
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1000"))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "3600"))
 
-async def get_ai_answer(question_text: str):
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
-            "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent",
-            params={"key": GEMINI_API_KEY},
-            json={"contents": [{"parts": [{"text": question_text}]}]}
+
+class AITimeout(Exception):
+    pass
+
+
+class GeminiProvider:
+    """Gemini through one shared GenerativeModel using its async API"""
+
+    def __init__(self, api_key: str, model_name: str = GEMINI_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.name = f"gemini:{model_name}"
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str):
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeProvider:
+    """Deterministic local stand-in for an LLM; no network access"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.name = "fake"
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._complete(prompt)
+
+    async def stream(self, prompt: str):
+        self.calls += 1
+        words = self._complete(prompt).split(" ")
+        for i, word in enumerate(words):
+            if self.latency:
+                # ``latency`` is spread over the whole completion, like a real token stream
+                await asyncio.sleep(self.latency / len(words))
+            yield word if i == 0 else " " + word
+
+    def _complete(self, prompt: str):
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        return f"[fake completion {digest}]\n" + prompt.strip()
+
+
+def question_fingerprint(kind: str, title: str, description: str, tags: str):
+    """Cache key for a prompt built from a question's content"""
+    raw = "\x1f".join([kind, title or "", description or "", tags or ""])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def answer_prompt(question):
+    return f"""
+        You are a helpful programming assistant. Please provide a detailed and accurate answer to the following question:
+
+        Title: {question.title}
+        Description: {question.description}
+        Tags: {question.tags}
+
+        Please provide:
+        1. A clear explanation of the problem
+        2. A step-by-step solution
+        3. Code examples if applicable
+        4. Best practices and recommendations
+
+        Format your response in a clear, structured way that would be helpful for a developer.
+        """
+
+
+def suggestion_prompt(question):
+    return f"""
+        Please analyze this programming question and suggest improvements to make it clearer and more likely to get good answers:
+
+        Title: {question.title}
+        Description: {question.description}
+        Tags: {question.tags}
+
+        Please provide:
+        1. Assessment of the question clarity
+        2. Suggestions for improving the title
+        3. Suggestions for improving the description
+        4. Recommended additional information to include
+        5. Better tag suggestions if applicable
+
+        Be constructive and helpful.
+        """
+
+
+class AIClient:
+    """Async front for a provider: bounded concurrency, timeouts and a result cache.
+
+    Identical requests already in flight share one provider call.
+    """
+
+    def __init__(self, provider, max_concurrency: int = AI_MAX_CONCURRENCY, timeout: float = AI_TIMEOUT,
+                 cache_size: int = AI_CACHE_SIZE, cache_ttl: float = AI_CACHE_TTL):
+        self.provider = provider
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache = OrderedDict()  # key -> (expires_at, text)
+        self._in_flight = {}  # key -> Task
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return text
+
+    def _store(self, key: str, text: str):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, text)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def complete(self, prompt: str, cache_key: str = None) -> str:
+        """Return the completion for ``prompt``, from cache when ``cache_key`` was seen"""
+        if cache_key is None:
+            return await self._call(prompt)
+        text = self.cached(cache_key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        task = self._in_flight.get(cache_key)
+        if task is None:
+            # Runs detached, so the result is still cached if the first caller disconnects
+            task = asyncio.ensure_future(self._call(prompt))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._finish(cache_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    async def stream(self, prompt: str, cache_key: str = None):
+        """Yield completion chunks as the provider produces them.
+
+        ``timeout`` applies to the wait for a slot and to each gap between chunks.
+        A cached completion is yielded as a single chunk; a finished stream is cached.
+        """
+        if cache_key is not None:
+            text = self.cached(cache_key)
+            if text is not None:
+                self.hits += 1
+                yield text
+                return
+            self.misses += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise AITimeout(f"AI provider did not answer within {self.timeout:g}s")
+        chunks = self.provider.stream(prompt)
+        parts = []
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise AITimeout(f"AI provider stalled for more than {self.timeout:g}s")
+                parts.append(chunk)
+                yield chunk
+        finally:
+            await chunks.aclose()
+            self._semaphore.release()
+        if cache_key is not None:
+            self._store(cache_key, "".join(parts))
+
+    async def _call(self, prompt: str) -> str:
+        try:
+            return await asyncio.wait_for(self._generate(prompt), self.timeout)
+        except asyncio.TimeoutError:
+            raise AITimeout(f"AI provider did not answer within {self.timeout:g}s")
+
+    async def _generate(self, prompt: str) -> str:
+        async with self._semaphore:
+            return await self.provider.generate(prompt)
+
+
+_client = None
+
+def create_ai_client():
+    if AI_PROVIDER == "fake":
+        return AIClient(FakeProvider(latency=float(os.getenv("AI_FAKE_LATENCY", "0"))))
+    if not GEMINI_API_KEY:
+        return None
+    return AIClient(GeminiProvider(GEMINI_API_KEY))
+
+def get_ai_client():
+    """FastAPI dependency returning the shared client; override it to swap providers in tests"""
+    global _client
+    if _client is None:
+        _client = create_ai_client()
+    if _client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is not configured"
         )
-    return res.json()
\ No newline at end of file
+    return _client
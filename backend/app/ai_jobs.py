@@ -0,0 +1,167 @@
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Set
+from . import schemas
+from .ai import AITimeout
+from .crud import create_answer
+from .database import AsyncSessionLocal
+
+# Concurrent jobs per process (provider calls are further capped by AI_MAX_CONCURRENCY)
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+# Jobs waiting or running at once, in total and per user
+AI_JOB_QUEUE_SIZE = int(os.getenv("AI_JOB_QUEUE_SIZE", "100"))
+AI_JOB_USER_QUOTA = int(os.getenv("AI_JOB_USER_QUOTA", "3"))
+# Finished jobs stay pollable for this many seconds
+AI_JOB_RETENTION = float(os.getenv("AI_JOB_RETENTION", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+@dataclass
+class AIJob:
+    id: str
+    question_id: int
+    user_id: int
+    prompt: Optional[str]
+    # Content fingerprint of the question; identical active requests share one job
+    fingerprint: str
+    client: object
+    status: str = QUEUED
+    # Characters generated so far
+    progress: int = 0
+    answer_id: Optional[int] = None
+    content: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # Users whose requests were folded into this job; all of them may poll it
+    requested_by: Set[int] = field(default_factory=set)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "question_id": self.question_id,
+            "status": self.status,
+            "progress": self.progress,
+            "answer_id": self.answer_id,
+            "content": self.content,
+            "error": self.error,
+        }
+
+
+class AIJobQueue:
+    """In-process FIFO of AI answer jobs drained by a fixed pool of asyncio workers"""
+
+    def __init__(self, workers: int = AI_JOB_WORKERS, max_size: int = AI_JOB_QUEUE_SIZE,
+                 user_quota: int = AI_JOB_USER_QUOTA, retention: float = AI_JOB_RETENTION):
+        self.worker_count = workers
+        self.max_size = max_size
+        self.user_quota = user_quota
+        self.retention = retention
+        self.jobs = {}  # job id -> AIJob
+        self._pending = {}  # (question_id, fingerprint) -> job id of the active job
+        self._queue = None
+        self._workers = []
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job.id for job in self.jobs.values() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    def enqueue(self, question_id: int, user_id: int, prompt: str, fingerprint: str, client):
+        """Return ``(job, deduplicated)``; an identical active job is shared instead of queued twice"""
+        self._prune()
+        job_id = self._pending.get((question_id, fingerprint))
+        if job_id is not None:
+            job = self.jobs[job_id]
+            job.requested_by.add(user_id)
+            return job, True
+
+        active = [job for job in self.jobs.values() if job.active]
+        if len(active) >= self.max_size:
+            raise QueueFull("AI job queue is full")
+        if sum(job.user_id == user_id for job in active) >= self.user_quota:
+            raise QuotaExceeded(f"At most {self.user_quota} AI jobs may be pending per user")
+
+        self._ensure_started()
+        job = AIJob(
+            id=uuid.uuid4().hex, question_id=question_id, user_id=user_id,
+            prompt=prompt, fingerprint=fingerprint, client=client, requested_by={user_id}
+        )
+        self.jobs[job.id] = job
+        self._pending[(question_id, fingerprint)] = job.id
+        self._queue.put_nowait(job)
+        return job, False
+
+    def get(self, job_id: str, user_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or user_id not in job.requested_by:
+            return None
+        return job
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._pending.pop((job.question_id, job.fingerprint), None)
+                job.finished_at = time.time()
+                job.prompt = job.client = None
+                self._queue.task_done()
+
+    async def _run(self, job: AIJob):
+        job.status = RUNNING
+        parts = []
+        try:
+            # Never from the result cache: a replayed completion would be saved as a duplicate answer
+            async for chunk in job.client.stream(job.prompt):
+                parts.append(chunk)
+                job.progress += len(chunk)
+            content = "".join(parts)
+            async with AsyncSessionLocal() as db:
+                answer = await db.run_sync(
+                    create_answer,
+                    answer=schemas.AnswerCreate(content=content),
+                    question_id=job.question_id,
+                    user_id=job.user_id
+                )
+        except AITimeout as e:
+            job.status, job.error = FAILED, str(e)
+        except Exception as e:
+            job.status, job.error = FAILED, f"Error generating AI answer: {str(e)}"
+        else:
+            job.status, job.answer_id, job.content = SUCCEEDED, answer.id, content
+
+
+queue = AIJobQueue()
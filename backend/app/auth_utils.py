@@ -3,7 +3,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from . import models, database
+from .principal_cache import Principal, principal_cache
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,33 +14,63 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(database.get_db)
 ):
-    """Get the current authenticated user from JWT token"""
+    """Get the current authenticated user from JWT token.
+
+    Returns a detached ``Principal`` (id, username, email, is_admin) rather than
+    an ORM ``User``; load the user explicitly if relationships are needed.
+    """
+    return get_principal_for_token(credentials.credentials, db)
+
+def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Like get_current_user, but also accepts ``?token=`` since EventSource cannot send headers.
+
+    A ``Depends(get_db)`` session stays open until the response ends, which for a
+    stream means a pool connection pinned per client; look the user up on a
+    session of our own instead and close it straight away.
+    """
+    if credentials is not None:
+        token = credentials.credentials
+    with database.SessionLocal() as db:
+        return get_principal_for_token(token, db)
+
+def get_principal_for_token(token: Optional[str], db: Session):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    if not token:
+        raise credentials_exception
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise credentials_exception
+    # Most requests are served from the cache without touching the users table
+    principal = principal_cache.get(email)
+    if principal is None:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.set(email, principal)
     
-    return user
+    return principal
 
-def get_current_admin_user(current_user: models.User = Depends(get_current_user)):
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)):
     """Ensure the current user is an admin"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -0,0 +1,18 @@
+"""Populate tags/question_tags from the legacy comma-separated Question.tags strings.
+
+Safe to re-run: each question's links are synced to its current tag string and
+tag counts are recomputed from the association table at the end.
+
+    python -m app.backfill_tags
+"""
+from .database import Base, SessionLocal, engine
+from . import crud
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print(f"Backfilled tags for {crud.backfill_question_tags(db)} questions")
+    finally:
+        db.close()
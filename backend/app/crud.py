@@ -1,10 +1,19 @@
-from sqlalchemy.orm import Session
-from . import models, schemas
-from passlib.hash import bcrypt
+from sqlalchemy import func, and_, or_, case, insert, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from pydantic import TypeAdapter
+from typing import List
+from . import models, schemas, search, pagination, passwords
+from .notification_hub import hub
+from .notification_coalescer import coalescer, notification_message
+from .thread_cache import thread_cache
+from collections import Counter
+from datetime import datetime, timedelta
 
 # User CRUD
 def create_user(db: Session, user: schemas.UserCreate):
-    hashed_pw = bcrypt.hash(user.password)
+    hashed_pw = passwords.hash_password(user.password)
     db_user = models.User(
         username=user.username, 
         email=user.email, 
@@ -12,6 +21,16 @@ def create_user(db: Session, user: schemas.UserCreate):
         is_admin=user.is_admin
     )
     db.add(db_user)
+    db.flush()
+
+    # Broadcasts sent before the account existed are never shown to it
+    latest_broadcast_id = get_latest_broadcast_id(db)
+    db.add(models.NotificationCursor(
+        user_id=db_user.id,
+        broadcast_floor_id=latest_broadcast_id,
+        broadcast_read_id=latest_broadcast_id,
+        broadcast_counted_id=latest_broadcast_id
+    ))
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -23,40 +42,132 @@ def get_user_by_id(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 def verify_password(plain, hashed):
-    return bcrypt.verify(plain, hashed)
+    return passwords.verify_password(plain, hashed)
+
+def authenticate_user(db: Session, email: str, password: str):
+    """Return the user for valid credentials, upgrading a stale password hash"""
+    user = get_user_by_email(db, email)
+    if not user or not verify_password(password, user.password):
+        return None
+    if passwords.needs_rehash(user.password):
+        # The plain password is only available here, so the cost change lands on login
+        user.password = passwords.hash_password(password)
+        db.commit()
+    return user
 
 # Question CRUD
 def create_question(db: Session, question: schemas.QuestionCreate, user_id: int):
     db_question = models.Question(**question.dict(), owner_id=user_id)
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    db.flush()
+    set_question_tags(db, db_question.id, db_question.tags)
 
-    
     # Get the question owner
     question_owner = get_user_by_id(db, user_id)
     
-    # Send notifications to all other users (not the question owner)
-    all_users = db.query(models.User).filter(models.User.id != user_id).all()
-    for user in all_users:
-        message = f"New question posted: '{db_question.title}' by {question_owner.username}"
-        create_notification(
-            db=db,
-            user_id=user.id,
-            message=message,
-            notification_type="new_question",
-            related_question_id=db_question.id
-        )
-    
+    # Notify all other users with a single broadcast row instead of one row per user
+    broadcast = models.BroadcastNotification(
+        message=f"New question posted: '{db_question.title}' by {question_owner.username}",
+        type="new_question",
+        sender_id=user_id,
+        related_question_id=db_question.id
+    )
+    db.add(broadcast)
+    db.commit()
+    db.refresh(db_question)
+    search.index.add(db_question)
+    db.refresh(broadcast)
+    hub.publish_all(_notification_event(_broadcast_row(broadcast, is_read=False)), exclude_user_id=user_id)
 
     return db_question
 
-def get_questions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Question).offset(skip).limit(limit).all()
+def get_questions(db: Session, limit: int = 100, cursor: str = None, tags: list = None, match_all: bool = True):
+    """Newest-first keyset page of questions, returned as ``(questions, next_cursor)``"""
+    query = db.query(models.Question)
+    tag_names = parse_tags(",".join(tags)) if tags else []
+    if tag_names:
+        # Resolve through the (tag_id, question_id) index instead of scanning tag strings
+        matching = db.query(models.QuestionTag.question_id).join(models.Tag).filter(
+            models.Tag.name.in_(tag_names)
+        ).group_by(models.QuestionTag.question_id)
+        if match_all:
+            matching = matching.having(func.count(models.QuestionTag.tag_id) == len(tag_names))
+        query = query.filter(models.Question.id.in_(matching))
+    return pagination.paginate(query, models.Question.created_at, models.Question.id, limit, cursor)
+
+def search_questions(db: Session, query: str, skip: int = 0, limit: int = 20):
+    """Return ``[(question, score)]`` ranked by relevance; callers check ``search.index.loaded`` first"""
+    ranked = search.index.search(query, limit=limit, skip=skip)
+    if not ranked:
+        return []
+    questions = db.query(models.Question).filter(
+        models.Question.id.in_([question_id for question_id, _ in ranked])
+    ).all()
+    by_id = {q.id: q for q in questions}
+    for question_id, _ in ranked:
+        if question_id not in by_id:
+            # Deleted by another worker; catch_up only sees rows that still exist
+            search.index.remove(question_id)
+    return [(by_id[question_id], score) for question_id, score in ranked if question_id in by_id]
 
 def get_question_by_id(db: Session, question_id: int):
     return db.query(models.Question).filter(models.Question.id == question_id).first()
 
+def get_question_version(db: Session, question_id: int):
+    """``(version, updated_at)`` of a question's thread, or None; never loads the thread"""
+    return db.query(models.Question.version, models.Question.updated_at).filter(
+        models.Question.id == question_id
+    ).first()
+
+def get_answer_thread_version(db: Session, answer_id: int):
+    """``(question_id, version, updated_at)`` of the thread an answer belongs to, or None"""
+    return db.query(models.Question.id, models.Question.version, models.Question.updated_at).join(
+        models.Answer, models.Answer.question_id == models.Question.id
+    ).filter(models.Answer.id == answer_id).first()
+
+def bump_question_version(db: Session, question_id: int = None, answer_id: int = None):
+    """Mark a question's thread (given directly or via one of its answers) as changed; the caller commits.
+
+    This is the write hook for thread caching: every crud write to a thread calls
+    it, which also evicts the thread's cached views.
+    """
+    if question_id is None:
+        question_id = db.query(models.Answer.question_id).filter(models.Answer.id == answer_id).scalar()
+        if question_id is None:
+            return
+    db.query(models.Question).filter(models.Question.id == question_id).update({
+        models.Question.version: models.Question.version + 1,
+        models.Question.updated_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    thread_cache.invalidate(question_id)
+
+# Serialized thread views, cached per question version; see thread_cache
+_comment_list = TypeAdapter(List[schemas.CommentOut])
+
+def get_question_thread_json(db: Session, question: models.Question):
+    """``question`` is already loaded (its row carries the version), so a miss adds one statement for its answers"""
+    def load():
+        return schemas.QuestionWithAnswers.model_validate(question).model_dump_json().encode()
+    return thread_cache.get_or_load(f"question:{question.id}:v{question.version}", question.id, load)
+
+def get_answers_page_json(db: Session, question_id: int, version: int, limit: int = 50, cursor: str = None):
+    def load():
+        items, next_cursor = get_answers_page(db, question_id, limit=limit, cursor=cursor)
+        page = schemas.AnswerPage(
+            items=[schemas.AnswerWithComments.model_validate(answer) for answer in items],
+            next_cursor=next_cursor
+        )
+        return page.model_dump_json().encode()
+    key = f"answers:{question_id}:v{version}:{limit}:{cursor or ''}"
+    return thread_cache.get_or_load(key, question_id, load)
+
+def get_comments_json(db: Session, answer_id: int, question_id: int, version: int):
+    def load():
+        return _comment_list.dump_json(
+            _comment_list.validate_python(get_comments_by_answer(db, answer_id), from_attributes=True)
+        )
+    return thread_cache.get_or_load(f"comments:{answer_id}:v{version}", question_id, load)
+
 def get_questions_by_user(db: Session, user_id: int):
     return db.query(models.Question).filter(models.Question.owner_id == user_id).all()
 
@@ -65,21 +176,201 @@ def update_question(db: Session, question_id: int, question_data: schemas.Questi
     if db_question:
         for key, value in question_data.dict().items():
             setattr(db_question, key, value)
+        set_question_tags(db, db_question.id, db_question.tags)
+        bump_question_version(db, question_id)
         db.commit()
         db.refresh(db_question)
+        search.index.update(db_question)
     return db_question
 
 def delete_question(db: Session, question_id: int):
     db_question = db.query(models.Question).filter(models.Question.id == question_id).first()
     if db_question:
+        set_question_tags(db, db_question.id, "")
+        db.query(models.QuestionHotScore).filter(
+            models.QuestionHotScore.question_id == question_id
+        ).delete(synchronize_session=False)
         db.delete(db_question)
         db.commit()
+        thread_cache.invalidate(question_id)
+        search.index.remove(question_id)
     return db_question
 
+# Tag CRUD
+def parse_tags(tags: str):
+    """Split a comma-separated tag string into normalized, de-duplicated names"""
+    names = []
+    for name in (tags or "").split(","):
+        name = name.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def get_or_create_tags(db: Session, names: list):
+    existing = db.query(models.Tag).filter(models.Tag.name.in_(names)).all() if names else []
+    by_name = {tag.name: tag for tag in existing}
+    for name in names:
+        if name not in by_name:
+            try:
+                with db.begin_nested():
+                    tag = models.Tag(name=name, question_count=0)
+                    db.add(tag)
+            except IntegrityError:
+                # Another request created it concurrently
+                tag = db.query(models.Tag).filter(models.Tag.name == name).one()
+            by_name[name] = tag
+    return [by_name[name] for name in names]
+
+def set_question_tags(db: Session, question_id: int, tags: str):
+    """Sync question_tags with a tag string and adjust per-tag counts (does not commit)"""
+    current_ids = {
+        tag_id for (tag_id,) in db.query(models.QuestionTag.tag_id).filter(
+            models.QuestionTag.question_id == question_id
+        )
+    }
+    wanted_ids = {tag.id for tag in get_or_create_tags(db, parse_tags(tags))}
+
+    added = wanted_ids - current_ids
+    removed = current_ids - wanted_ids
+    if removed:
+        db.query(models.QuestionTag).filter(
+            models.QuestionTag.question_id == question_id,
+            models.QuestionTag.tag_id.in_(removed)
+        ).delete(synchronize_session=False)
+        db.query(models.Tag).filter(models.Tag.id.in_(removed)).update(
+            {models.Tag.question_count: models.Tag.question_count - 1}, synchronize_session=False
+        )
+    if added:
+        db.add_all([models.QuestionTag(question_id=question_id, tag_id=tag_id) for tag_id in added])
+        db.query(models.Tag).filter(models.Tag.id.in_(added)).update(
+            {models.Tag.question_count: models.Tag.question_count + 1}, synchronize_session=False
+        )
+
+def backfill_question_tags(db: Session, batch_size: int = 500):
+    """Sync every question's tag links with its tag string, then recompute tag counts.
+
+    Safe to re-run; the counts come from the association table at the end, so
+    they are exact even if an earlier run was interrupted. Returns the number of
+    questions synced.
+    """
+    last_id = 0
+    synced = 0
+    while True:
+        batch = db.query(models.Question.id, models.Question.tags).filter(
+            models.Question.id > last_id
+        ).order_by(models.Question.id).limit(batch_size).all()
+        if not batch:
+            break
+        for question_id, tags in batch:
+            set_question_tags(db, question_id, tags)
+        db.commit()
+        last_id = batch[-1][0]
+        synced += len(batch)
+
+    counts = dict(db.query(models.QuestionTag.tag_id, func.count()).group_by(models.QuestionTag.tag_id))
+    for tag in db.query(models.Tag):
+        tag.question_count = counts.get(tag.id, 0)
+    db.commit()
+    return synced
+
+def get_tags(db: Session, skip: int = 0, limit: int = 100):
+    return db.query(models.Tag).filter(models.Tag.question_count > 0).order_by(
+        models.Tag.question_count.desc(), models.Tag.name
+    ).offset(skip).limit(limit).all()
+
+# Hot feed
+def get_hot_questions(db: Session, limit: int = 30, cursor: str = None):
+    """Highest hot score first, as ``([(question, score)], next_cursor)``; one index range scan"""
+    query = db.query(models.Question, models.QuestionHotScore.score).join(
+        models.QuestionHotScore, models.QuestionHotScore.question_id == models.Question.id
+    )
+    if cursor:
+        score, question_id = pagination.decode_score_cursor(cursor)
+        query = query.filter(or_(
+            models.QuestionHotScore.score < score,
+            and_(models.QuestionHotScore.score == score, models.QuestionHotScore.question_id < question_id)
+        ))
+    rows = query.order_by(
+        models.QuestionHotScore.score.desc(), models.QuestionHotScore.question_id.desc()
+    ).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    question, score = rows[-1]
+    return rows, pagination.encode_score_cursor(score, question.id)
+
+def get_hot_watermark(db: Session):
+    """Latest questions.updated_at already reflected in question_hot_scores"""
+    return db.query(func.max(models.QuestionHotScore.source_updated_at)).scalar()
+
+def _upsert(db: Session, model, rows: list):
+    """Insert ``rows``, overwriting the other columns of any whose primary key already exists"""
+    keys = [column.name for column in model.__table__.primary_key]
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(model).values(rows)
+        stmt = stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in rows[0] if name not in keys})
+    elif dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys, set_={name: stmt.excluded[name] for name in rows[0] if name not in keys}
+        )
+    else:
+        for row in rows:
+            db.merge(model(**row))
+        return
+    db.execute(stmt)
+
+def refresh_hot_scores(db: Session, score, since: datetime = None, position=None, batch_size: int = 500):
+    """Recompute hot scores for one batch of questions changed after ``since``.
+
+    ``score(net_votes, answer_count, accepted, created_at)`` ranks a question.
+    Batches walk (updated_at, id) order; pass the returned position back in to
+    continue. Returns ``(questions_scored, position)``, position None when done.
+    """
+    query = db.query(models.Question.id, models.Question.created_at, models.Question.updated_at).filter(
+        models.Question.updated_at.isnot(None)
+    )
+    if since is not None:
+        query = query.filter(models.Question.updated_at > since)
+    if position is not None:
+        updated_at, question_id = position
+        query = query.filter(or_(
+            models.Question.updated_at > updated_at,
+            and_(models.Question.updated_at == updated_at, models.Question.id > question_id)
+        ))
+    questions = query.order_by(models.Question.updated_at, models.Question.id).limit(batch_size).all()
+    if not questions:
+        return 0, None
+
+    ids = [question.id for question in questions]
+    activity = {
+        question_id: (net_votes or 0, answer_count, bool(accepted))
+        for question_id, net_votes, answer_count, accepted in db.query(
+            models.Answer.question_id,
+            func.sum(models.Answer.score),
+            func.count(models.Answer.id),
+            func.max(case((models.Answer.is_accepted == True, 1), else_=0))
+        ).filter(models.Answer.question_id.in_(ids)).group_by(models.Answer.question_id)
+    }
+    # Upsert: every worker runs the refresh, so two may score the same new question at once
+    _upsert(db, models.QuestionHotScore, [
+        {
+            "question_id": question.id,
+            "score": score(*activity.get(question.id, (0, 0, False)), question.created_at),
+            "source_updated_at": question.updated_at,
+        }
+        for question in questions
+    ])
+    db.commit()
+    last = questions[-1]
+    return len(questions), (last.updated_at, last.id) if len(questions) == batch_size else None
+
 # Answer CRUD
 def create_answer(db: Session, answer: schemas.AnswerCreate, question_id: int, user_id: int):
     db_answer = models.Answer(**answer.dict(), question_id=question_id, owner_id=user_id)
     db.add(db_answer)
+    bump_question_version(db, question_id)
     db.commit()
     db.refresh(db_answer)
     return db_answer
@@ -87,14 +378,27 @@ def create_answer(db: Session, answer: schemas.AnswerCreate, question_id: int, u
 def get_answers_by_question(db: Session, question_id: int):
     return db.query(models.Answer).filter(models.Answer.question_id == question_id).all()
 
+def get_answers_page(db: Session, question_id: int, limit: int = 50, cursor: str = None):
+    """Oldest-first keyset page of a question's answers, returned as ``(answers, next_cursor)``"""
+    query = db.query(models.Answer).options(
+        selectinload(models.Answer.comments)
+    ).filter(models.Answer.question_id == question_id)
+    return pagination.paginate(query, models.Answer.created_at, models.Answer.id, limit, cursor, descending=False)
+
 def get_answer_by_id(db: Session, answer_id: int):
     return db.query(models.Answer).filter(models.Answer.id == answer_id).first()
 
+def get_answer_with_comments(db: Session, answer_id: int):
+    return db.query(models.Answer).options(
+        selectinload(models.Answer.comments)
+    ).filter(models.Answer.id == answer_id).first()
+
 def update_answer(db: Session, answer_id: int, answer_data: schemas.AnswerCreate):
     db_answer = db.query(models.Answer).filter(models.Answer.id == answer_id).first()
     if db_answer:
         for key, value in answer_data.dict().items():
             setattr(db_answer, key, value)
+        bump_question_version(db, db_answer.question_id)
         db.commit()
         db.refresh(db_answer)
     return db_answer
@@ -110,6 +414,7 @@ def accept_answer(db: Session, answer_id: int):
         
         # Accept this answer
         db_answer.is_accepted = True
+        bump_question_version(db, db_answer.question_id)
         db.commit()
         db.refresh(db_answer)
     return db_answer
@@ -117,6 +422,7 @@ def accept_answer(db: Session, answer_id: int):
 def delete_answer(db: Session, answer_id: int):
     db_answer = db.query(models.Answer).filter(models.Answer.id == answer_id).first()
     if db_answer:
+        bump_question_version(db, db_answer.question_id)
         db.delete(db_answer)
         db.commit()
     return db_answer
@@ -125,6 +431,7 @@ def delete_answer(db: Session, answer_id: int):
 def create_comment(db: Session, comment: schemas.CommentCreate, answer_id: int, user_id: int):
     db_comment = models.Comment(content=comment.content, answer_id=answer_id, owner_id=user_id)
     db.add(db_comment)
+    bump_question_version(db, answer_id=answer_id)
     db.commit()
     db.refresh(db_comment)
     return db_comment
@@ -139,6 +446,7 @@ def update_comment(db: Session, comment_id: int, content: str):
     db_comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
     if db_comment:
         db_comment.content = content
+        bump_question_version(db, answer_id=db_comment.answer_id)
         db.commit()
         db.refresh(db_comment)
     return db_comment
@@ -146,6 +454,7 @@ def update_comment(db: Session, comment_id: int, content: str):
 def delete_comment(db: Session, comment_id: int):
     db_comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
     if db_comment:
+        bump_question_version(db, answer_id=db_comment.answer_id)
         db.delete(db_comment)
         db.commit()
     return db_comment
@@ -162,10 +471,198 @@ def create_notification(db: Session, user_id: int, message: str, notification_ty
         related_answer_id=related_answer_id
     )
     db.add(db_notification)
+    db.flush()
+    version = _update_unread_count(db, user_id, models.NotificationCursor.unread_count + 1)
     db.commit()
     db.refresh(db_notification)
+    hub.publish(user_id, _notification_event(_notification_row(db_notification), version=version))
     return db_notification
 
+def write_notification_groups(db: Session, groups: list, window: float):
+    """Write coalesced event groups from the notification buffer in one transaction.
+
+    A group is merged into the user's unread row for the same type and answer if
+    one was created within ``window`` seconds; otherwise it starts a new row.
+
+    Several workers may flush groups for the same user at once, so each user's
+    cursor row is locked first (in user id order, to avoid deadlocks): the
+    lookup and the merge or insert that follows cannot interleave with another
+    flush, which would lose actor increments or create duplicate rows. Accounts
+    get their cursor row at registration (older ones from reconcile_unread_counts).
+    """
+    since = datetime.utcnow() - timedelta(seconds=window)
+    db.query(models.NotificationCursor.user_id).filter(
+        models.NotificationCursor.user_id.in_(sorted({group.user_id for group in groups}))
+    ).order_by(models.NotificationCursor.user_id).with_for_update().all()
+    written = []
+    for group in groups:
+        notification = db.query(models.Notification).filter(
+            models.Notification.user_id == group.user_id,
+            models.Notification.is_read == False,
+            models.Notification.created_at >= since,
+            models.Notification.type == group.notification_type,
+            models.Notification.related_answer_id == group.related_answer_id
+        ).order_by(models.Notification.created_at.desc()).first()
+        is_new = notification is None
+        if is_new:
+            notification = models.Notification(
+                user_id=group.user_id,
+                type=group.notification_type,
+                related_question_id=group.related_question_id,
+                related_answer_id=group.related_answer_id,
+                actor_count=group.new_actors
+            )
+            db.add(notification)
+        else:
+            # Relative, like apply_vote_delta; the message is built from the stored total
+            db.query(models.Notification).filter(models.Notification.id == notification.id).update({
+                models.Notification.actor_count: models.Notification.actor_count + group.new_actors
+            }, synchronize_session=False)
+            db.refresh(notification, ["actor_count"])
+        notification.message = notification_message(group.actor_name, notification.actor_count, group.action)
+        written.append((notification, is_new))
+    db.flush()
+
+    created = Counter(notification.user_id for notification, is_new in written if is_new)
+    versions = {
+        user_id: _update_unread_count(db, user_id, models.NotificationCursor.unread_count + count)
+        for user_id, count in created.items()
+    }
+    events = [
+        (n.user_id, _notification_event(_notification_row(n), is_new, versions.get(n.user_id) if is_new else None))
+        for n, is_new in written
+    ]
+    db.commit()
+    for user_id, event in events:
+        hub.publish(user_id, event)
+    return len(written)
+
+def _count_unread_rows(db: Session, user_id: int):
+    return db.query(func.count(models.Notification.id)).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.is_read == False
+    ).scalar()
+
+def _update_unread_count(db: Session, user_id: int, value):
+    """Set the stored unread counter to ``value`` (an int or SQL expression); the caller commits.
+
+    Accounts without a cursor row get one holding the exact count instead, so the
+    caller must have flushed its own change first. Returns the new unread version.
+    """
+    updated = db.query(models.NotificationCursor).filter(
+        models.NotificationCursor.user_id == user_id
+    ).update({models.NotificationCursor.unread_count: value}, synchronize_session=False)
+    if not updated:
+        cursor = get_notification_cursor(db, user_id)
+        cursor.unread_count = _count_unread_rows(db, user_id)
+        db.add(cursor)
+        db.flush()
+    return _bump_unread_version(db, user_id)
+
+def _bump_unread_version(db: Session, user_id: int):
+    """Advance the user's unread version and return it; the caller commits and publishes it with its event.
+
+    The row stays locked until that commit, so versions reach the database in order.
+    """
+    version = models.NotificationCursor.unread_version
+    db.query(models.NotificationCursor).filter(
+        models.NotificationCursor.user_id == user_id
+    ).update({version: version + 1}, synchronize_session=False)
+    return db.query(version).filter(models.NotificationCursor.user_id == user_id).scalar()
+
+def _decremented_unread_count():
+    unread = models.NotificationCursor.unread_count
+    return case((unread > 0, unread - 1), else_=0)
+
+def count_unread_notifications(db: Session, user_id: int):
+    """Unread count for the bell: the stored counter plus unread broadcasts"""
+    cursor = get_notification_cursor(db, user_id)
+    return (cursor.unread_count or 0) + count_unread_broadcasts(db, user_id, cursor)
+
+def get_unread_state(db: Session, user_id: int):
+    """``(unread_count, unread_version, latest_broadcast_id)`` read together in one transaction.
+
+    An event carrying a version (or, for a new broadcast, an id) at or below these
+    is already included in the count.
+    """
+    cursor = get_notification_cursor(db, user_id)
+    count = (cursor.unread_count or 0) + count_unread_broadcasts(db, user_id, cursor)
+    return count, cursor.unread_version or 0, get_latest_broadcast_id(db)
+
+def reconcile_unread_counts(db: Session, batch_size: int = 1000):
+    """Correct stored unread counters that drifted from the notifications table.
+
+    Creates missing cursor rows first. Returns the number of counters corrected.
+    """
+    missing = db.query(models.User.id).outerjoin(
+        models.NotificationCursor, models.NotificationCursor.user_id == models.User.id
+    ).filter(models.NotificationCursor.user_id.is_(None)).all()
+    db.add_all([
+        models.NotificationCursor(user_id=user_id, broadcast_floor_id=0, broadcast_read_id=0, unread_count=0)
+        for (user_id,) in missing
+    ])
+    db.commit()
+
+    actual = db.query(func.count(models.Notification.id)).filter(
+        models.Notification.user_id == models.NotificationCursor.user_id,
+        models.Notification.is_read == False
+    ).scalar_subquery()
+    last_id = 0
+    corrected = 0
+    while True:
+        ids = [user_id for (user_id,) in db.query(models.NotificationCursor.user_id).filter(
+            models.NotificationCursor.user_id > last_id
+        ).order_by(models.NotificationCursor.user_id).limit(batch_size)]
+        if not ids:
+            break
+        corrected += db.query(models.NotificationCursor).filter(
+            models.NotificationCursor.user_id.in_(ids),
+            models.NotificationCursor.unread_count != actual
+        ).update({models.NotificationCursor.unread_count: actual}, synchronize_session=False)
+        db.commit()
+        last_id = ids[-1]
+    return corrected
+
+def _notification_row(notification: models.Notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "type": notification.type,
+        "is_read": notification.is_read,
+        "is_broadcast": False,
+        "related_question_id": notification.related_question_id,
+        "related_answer_id": notification.related_answer_id,
+        "created_at": notification.created_at,
+        "actor_count": notification.actor_count,
+    }
+
+def _broadcast_row(broadcast: models.BroadcastNotification, is_read: bool):
+    return {
+        "id": broadcast.id,
+        "message": broadcast.message,
+        "type": broadcast.type,
+        "is_read": is_read,
+        "is_broadcast": True,
+        "related_question_id": broadcast.related_question_id,
+        "related_answer_id": broadcast.related_answer_id,
+        "created_at": broadcast.created_at,
+    }
+
+# Push events for connected clients; ``unread_delta`` applies to the unread count. Events
+# that change a user's count carry the ``version`` it was changed to (see get_unread_state).
+def _notification_event(row: dict, is_new: bool = True, version: int = None):
+    # A coalesced row is re-sent under its existing id; clients replace it in place
+    return {
+        "event": "notification",
+        "notification": schemas.NotificationResponse(**row).model_dump(mode="json"),
+        "unread_delta": 1 if is_new and not row["is_read"] else 0,
+        "version": version,
+    }
+
+def _change_event(event: str, id: int, is_broadcast: bool, was_unread: bool, version: int = None):
+    return {"event": event, "id": id, "is_broadcast": is_broadcast, "unread_delta": -1 if was_unread else 0,
+            "version": version}
+
 def get_notifications_by_user(db: Session, user_id: int):
     return db.query(models.Notification).filter(
         models.Notification.user_id == user_id
@@ -177,17 +674,26 @@ def mark_notification_read(db: Session, notification_id: int, user_id: int):
         models.Notification.user_id == user_id
     ).first()
     if db_notification:
+        was_unread = not db_notification.is_read
         db_notification.is_read = True
+        version = None
+        if was_unread:
+            db.flush()
+            version = _update_unread_count(db, user_id, _decremented_unread_count())
         db.commit()
         db.refresh(db_notification)
+        hub.publish(user_id, _change_event("read", notification_id, False, was_unread, version))
     return db_notification
 
 def mark_all_notifications_read(db: Session, user_id: int):
-    db.query(models.Notification).filter(
+    updated = db.query(models.Notification).filter(
         models.Notification.user_id == user_id,
         models.Notification.is_read == False
     ).update({"is_read": True})
+    version = _update_unread_count(db, user_id, 0)
     db.commit()
+    if updated:
+        hub.publish(user_id, {"event": "all_read", "is_broadcast": False, "unread_delta": -updated, "version": version})
 
 def delete_notification(db: Session, notification_id: int, user_id: int):
     db_notification = db.query(models.Notification).filter(
@@ -195,11 +701,251 @@ def delete_notification(db: Session, notification_id: int, user_id: int):
         models.Notification.user_id == user_id
     ).first()
     if db_notification:
+        was_unread = not db_notification.is_read
         db.delete(db_notification)
+        version = None
+        if was_unread:
+            db.flush()
+            version = _update_unread_count(db, user_id, _decremented_unread_count())
         db.commit()
+        hub.publish(user_id, _change_event("deleted", notification_id, False, was_unread, version))
     return db_notification
 
+def purge_read_notifications(db: Session, cutoff: datetime, batch_size: int = 500, archive: bool = True):
+    """Archive (or delete) one batch of read notifications created before ``cutoff``.
+
+    Each call is one short transaction over at most ``batch_size`` rows picked by
+    primary key; returns how many rows were removed from ``notifications``.
+    """
+    ids = [notification_id for (notification_id,) in db.query(models.Notification.id).filter(
+        models.Notification.is_read == True,
+        models.Notification.created_at < cutoff
+    ).order_by(models.Notification.created_at).limit(batch_size)]
+    if not ids:
+        return 0
+    if archive:
+        columns = ["id", "message", "type", "is_read", "user_id",
+                   "related_question_id", "related_answer_id", "created_at", "actor_count"]
+        db.execute(insert(models.ArchivedNotification).from_select(
+            columns,
+            select(*(getattr(models.Notification, column) for column in columns)).where(
+                models.Notification.id.in_(ids)
+            )
+        ))
+    removed = db.query(models.Notification).filter(
+        models.Notification.id.in_(ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+# Source ranks used to order notifications and broadcasts that share a timestamp
+NOTIFICATION_KIND = 0
+BROADCAST_KIND = 1
+
+def get_notifications_page(db: Session, user_id: int, limit: int = 50, cursor: str = None):
+    """Newest-first keyset page over the user's notifications merged with broadcasts.
+
+    Returns ``(rows, next_cursor)`` where rows are NotificationResponse-shaped dicts.
+    Ties on created_at are broken by (source, id) so the cursor stays unambiguous.
+    """
+    position = pagination.decode_cursor(cursor) if cursor else None
+    query = pagination.keyset_filter(
+        db.query(models.Notification).filter(models.Notification.user_id == user_id),
+        models.Notification.created_at, models.Notification.id, position, kind=NOTIFICATION_KIND
+    )
+    query = pagination.order_by_keyset(query, models.Notification.created_at, models.Notification.id)
+    rows = [_notification_row(n) for n in query.limit(limit + 1).all()]
+    rows += get_broadcasts_for_user(db, user_id, limit=limit + 1, position=position)
+    rows.sort(key=_notification_sort_key, reverse=True)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, pagination.encode_cursor(last["created_at"], last["id"], kind=_notification_sort_key(last)[1])
+
+def _notification_sort_key(row):
+    return (row["created_at"], BROADCAST_KIND if row["is_broadcast"] else NOTIFICATION_KIND, row["id"])
+
+# Broadcast notification CRUD
+def get_latest_broadcast_id(db: Session):
+    return db.query(func.max(models.BroadcastNotification.id)).scalar() or 0
+
+def get_notification_cursor(db: Session, user_id: int, lock: bool = False):
+    """The user's cursor row; ``lock`` holds it (FOR UPDATE) until the caller commits"""
+    cursor = db.get(models.NotificationCursor, user_id, with_for_update=lock or None, populate_existing=lock)
+    if cursor is None:
+        # Accounts created before broadcasts existed start with empty watermarks
+        cursor = models.NotificationCursor(
+            user_id=user_id, broadcast_floor_id=0, broadcast_read_id=0, broadcast_counted_id=0, broadcast_unread=0
+        )
+    return cursor
+
+def _visible_broadcasts(db: Session, user_id: int, cursor: models.NotificationCursor):
+    return db.query(models.BroadcastNotification, models.BroadcastReceipt).outerjoin(
+        models.BroadcastReceipt,
+        and_(
+            models.BroadcastReceipt.broadcast_id == models.BroadcastNotification.id,
+            models.BroadcastReceipt.user_id == user_id
+        )
+    ).filter(
+        models.BroadcastNotification.id > (cursor.broadcast_floor_id or 0),
+        models.BroadcastNotification.sender_id != user_id,
+        or_(models.BroadcastReceipt.id.is_(None), models.BroadcastReceipt.is_dismissed == False)
+    )
+
+def get_broadcasts_for_user(db: Session, user_id: int, limit: int = None, position=None):
+    """Return the user's visible broadcasts shaped like NotificationResponse rows, newest first"""
+    cursor = get_notification_cursor(db, user_id)
+    query = pagination.keyset_filter(
+        _visible_broadcasts(db, user_id, cursor),
+        models.BroadcastNotification.created_at, models.BroadcastNotification.id,
+        position, kind=BROADCAST_KIND
+    )
+    query = pagination.order_by_keyset(query, models.BroadcastNotification.created_at, models.BroadcastNotification.id)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
+    return [_broadcast_row(broadcast, _broadcast_is_read(broadcast, receipt, cursor)) for broadcast, receipt in rows]
+
+def _broadcast_is_read(broadcast, receipt, cursor):
+    return broadcast.id <= (cursor.broadcast_read_id or 0) or bool(receipt and receipt.is_read)
+
+def count_unread_broadcasts(db: Session, user_id: int, cursor: models.NotificationCursor):
+    """The cursor's tally plus a count of the unread broadcasts newer than it.
+
+    Only broadcasts since the tally was last moved forward (see
+    ``advance_broadcast_tallies``) are scanned, however long the user goes
+    without marking everything read.
+    """
+    newer = _visible_broadcasts(db, user_id, cursor).filter(
+        models.BroadcastNotification.id > max(cursor.broadcast_read_id or 0, cursor.broadcast_counted_id or 0),
+        or_(models.BroadcastReceipt.id.is_(None), models.BroadcastReceipt.is_read == False)
+    ).count()
+    return (cursor.broadcast_unread or 0) + newer
+
+def _untally_broadcast(db: Session, cursor: models.NotificationCursor, broadcast_id: int):
+    """A tallied broadcast stopped being unread; the caller commits"""
+    if broadcast_id <= (cursor.broadcast_counted_id or 0):
+        unread = models.NotificationCursor.broadcast_unread
+        db.query(models.NotificationCursor).filter(
+            models.NotificationCursor.user_id == cursor.user_id
+        ).update({unread: case((unread > 0, unread - 1), else_=0)}, synchronize_session=False)
+
+def advance_broadcast_tallies(db: Session, batch_size: int = 1000):
+    """Fold the unread broadcasts sent since each cursor's tally into it, one batch of users per transaction.
+
+    Returns the number of cursors moved forward.
+    """
+    latest_id = get_latest_broadcast_id(db)
+    broadcast, receipt, cursor = models.BroadcastNotification, models.BroadcastReceipt, models.NotificationCursor
+    newer = select(func.count(broadcast.id)).outerjoin(
+        receipt, and_(receipt.broadcast_id == broadcast.id, receipt.user_id == cursor.user_id)
+    ).where(
+        broadcast.id > cursor.broadcast_counted_id,
+        broadcast.id > cursor.broadcast_read_id,
+        broadcast.id > cursor.broadcast_floor_id,
+        broadcast.id <= latest_id,
+        broadcast.sender_id != cursor.user_id,
+        or_(receipt.id.is_(None), and_(receipt.is_read == False, receipt.is_dismissed == False))
+    ).correlate(cursor).scalar_subquery()
+    last_id = 0
+    advanced = 0
+    while True:
+        ids = [user_id for (user_id,) in db.query(cursor.user_id).filter(
+            cursor.user_id > last_id
+        ).order_by(cursor.user_id).limit(batch_size)]
+        if not ids:
+            break
+        advanced += db.query(cursor).filter(
+            cursor.user_id.in_(ids),
+            cursor.broadcast_counted_id < latest_id
+        ).update({
+            cursor.broadcast_unread: cursor.broadcast_unread + newer,
+            cursor.broadcast_counted_id: latest_id,
+        }, synchronize_session=False)
+        db.commit()
+        last_id = ids[-1]
+    return advanced
+
+def _get_or_create_receipt(db: Session, broadcast_id: int, user_id: int):
+    receipt = db.query(models.BroadcastReceipt).filter(
+        models.BroadcastReceipt.broadcast_id == broadcast_id,
+        models.BroadcastReceipt.user_id == user_id
+    ).first()
+    if receipt is None:
+        receipt = models.BroadcastReceipt(broadcast_id=broadcast_id, user_id=user_id, is_read=False, is_dismissed=False)
+        db.add(receipt)
+    return receipt
+
+def get_broadcast_for_user(db: Session, broadcast_id: int, user_id: int):
+    cursor = get_notification_cursor(db, user_id)
+    row = _visible_broadcasts(db, user_id, cursor).filter(
+        models.BroadcastNotification.id == broadcast_id
+    ).first()
+    return row[0] if row else None
+
+def mark_broadcast_read(db: Session, broadcast_id: int, user_id: int):
+    broadcast = get_broadcast_for_user(db, broadcast_id, user_id)
+    if broadcast:
+        # Locked, so advance_broadcast_tallies cannot count this broadcast as unread meanwhile
+        cursor = get_notification_cursor(db, user_id, lock=True)
+        receipt = _get_or_create_receipt(db, broadcast_id, user_id)
+        was_unread = not _broadcast_is_read(broadcast, receipt, cursor)
+        receipt.is_read = True
+        version = None
+        if was_unread:
+            _untally_broadcast(db, cursor, broadcast_id)
+            version = _bump_unread_version(db, user_id)
+        db.commit()
+        hub.publish(user_id, _change_event("read", broadcast_id, True, was_unread, version))
+    return broadcast
+
+def dismiss_broadcast(db: Session, broadcast_id: int, user_id: int):
+    broadcast = get_broadcast_for_user(db, broadcast_id, user_id)
+    if broadcast:
+        cursor = get_notification_cursor(db, user_id, lock=True)
+        receipt = _get_or_create_receipt(db, broadcast_id, user_id)
+        was_unread = not _broadcast_is_read(broadcast, receipt, cursor)
+        receipt.is_dismissed = True
+        version = None
+        if was_unread:
+            _untally_broadcast(db, cursor, broadcast_id)
+            version = _bump_unread_version(db, user_id)
+        db.commit()
+        hub.publish(user_id, _change_event("deleted", broadcast_id, True, was_unread, version))
+    return broadcast
+
+def mark_all_broadcasts_read(db: Session, user_id: int):
+    cursor = get_notification_cursor(db, user_id, lock=True)
+    unread = count_unread_broadcasts(db, user_id, cursor)
+    # Advancing the read watermark marks every existing broadcast read in one write
+    cursor.broadcast_read_id = cursor.broadcast_counted_id = get_latest_broadcast_id(db)
+    cursor.broadcast_unread = 0
+    db.add(cursor)
+    db.flush()
+    version = _bump_unread_version(db, user_id) if unread else None
+    db.commit()
+    if unread:
+        hub.publish(user_id, {"event": "all_read", "is_broadcast": True, "unread_delta": -unread, "version": version})
+
 # Vote CRUD
+def apply_vote_delta(db: Session, answer_id: int, old_type: str = None, new_type: str = None):
+    """Adjust an answer's vote tallies for a vote going from old_type to new_type.
+
+    Issued as a single relative UPDATE so concurrent votes cannot lose increments;
+    the caller commits it together with the vote row change. The question's
+    version is bumped too, since tallies are part of its thread.
+    """
+    up = (new_type == "upvote") - (old_type == "upvote")
+    down = (new_type == "downvote") - (old_type == "downvote")
+    if up or down:
+        db.query(models.Answer).filter(models.Answer.id == answer_id).update({
+            models.Answer.upvotes: models.Answer.upvotes + up,
+            models.Answer.downvotes: models.Answer.downvotes + down,
+            models.Answer.score: models.Answer.score + (up - down),
+        }, synchronize_session=False)
+        bump_question_version(db, answer_id=answer_id)
+
 def create_or_update_vote(db: Session, user_id: int, answer_id: int, vote_type: str):
     # Check if vote already exists
     existing_vote = db.query(models.Vote).filter(
@@ -211,10 +957,12 @@ def create_or_update_vote(db: Session, user_id: int, answer_id: int, vote_type:
         if existing_vote.vote_type == vote_type:
             # Remove vote if same type
             db.delete(existing_vote)
+            apply_vote_delta(db, answer_id, old_type=vote_type)
             db.commit()
             return None, "removed"
         else:
             # Update vote type
+            apply_vote_delta(db, answer_id, old_type=existing_vote.vote_type, new_type=vote_type)
             existing_vote.vote_type = vote_type
             db.commit()
             db.refresh(existing_vote)
@@ -227,22 +975,95 @@ def create_or_update_vote(db: Session, user_id: int, answer_id: int, vote_type:
             vote_type=vote_type
         )
         db.add(new_vote)
+        apply_vote_delta(db, answer_id, new_type=vote_type)
         db.commit()
         db.refresh(new_vote)
         return new_vote, "created"
 
+def record_vote(db: Session, user_id: int, username: str, answer: models.Answer, vote_type: str):
+    """Apply a vote toggle and notify the answer owner of upvotes in one write job.
+
+    With coalescing on, the upvote only goes to the in-memory notification buffer.
+    """
+    vote, action = create_or_update_vote(db, user_id, answer.id, vote_type)
+    if action != "removed" and vote_type == "upvote":
+        if coalescer.coalesces("vote"):
+            coalescer.add(
+                answer.owner_id, "vote", user_id, username, "upvoted your answer",
+                related_question_id=answer.question_id, related_answer_id=answer.id
+            )
+        else:
+            create_notification(
+                db,
+                user_id=answer.owner_id,
+                message=notification_message(username, 1, "upvoted your answer"),
+                notification_type="vote",
+                related_answer_id=answer.id,
+                related_question_id=answer.question_id
+            )
+    return action
+
 def get_vote_counts(db: Session, answer_id: int):
-    upvotes = db.query(models.Vote).filter(
-        models.Vote.answer_id == answer_id,
-        models.Vote.vote_type == "upvote"
-    ).count()
-    
-    downvotes = db.query(models.Vote).filter(
-        models.Vote.answer_id == answer_id,
-        models.Vote.vote_type == "downvote"
-    ).count()
-    
-    return {"upvotes": upvotes, "downvotes": downvotes, "net_votes": upvotes - downvotes}
+    answer = db.get(models.Answer, answer_id)
+    if answer is None:
+        return {"upvotes": 0, "downvotes": 0, "net_votes": 0}
+    return {"upvotes": answer.upvotes, "downvotes": answer.downvotes, "net_votes": answer.score}
+
+def get_vote_summaries(db: Session, user_id: int, question_id: int = None, answer_ids: list = None):
+    """Vote tallies plus the caller's own vote for many answers in two queries"""
+    query = db.query(
+        models.Answer.id, models.Answer.upvotes, models.Answer.downvotes, models.Answer.score
+    )
+    if question_id is not None:
+        query = query.filter(models.Answer.question_id == question_id)
+    if answer_ids is not None:
+        query = query.filter(models.Answer.id.in_(answer_ids))
+    tallies = query.order_by(models.Answer.id).all()
+    if not tallies:
+        return []
+
+    user_votes = dict(db.query(models.Vote.answer_id, models.Vote.vote_type).filter(
+        models.Vote.user_id == user_id,
+        models.Vote.answer_id.in_([answer_id for answer_id, _, _, _ in tallies])
+    ).all())
+    return [
+        {
+            "answer_id": answer_id,
+            "upvotes": upvotes,
+            "downvotes": downvotes,
+            "net_votes": score,
+            "user_vote": user_votes.get(answer_id),
+        }
+        for answer_id, upvotes, downvotes, score in tallies
+    ]
+
+def reconcile_vote_counts(db: Session, batch_size: int = 1000):
+    """Rebuild Answer vote tallies from the votes table in answer-id batches"""
+    def tally(vote_type):
+        return db.query(func.count(models.Vote.id)).filter(
+            models.Vote.answer_id == models.Answer.id,
+            models.Vote.vote_type == vote_type
+        ).scalar_subquery()
+
+    last_id = 0
+    reconciled = 0
+    while True:
+        ids = [answer_id for (answer_id,) in db.query(models.Answer.id).filter(
+            models.Answer.id > last_id
+        ).order_by(models.Answer.id).limit(batch_size)]
+        if not ids:
+            break
+        db.query(models.Answer).filter(models.Answer.id.in_(ids)).update({
+            models.Answer.upvotes: tally("upvote"),
+            models.Answer.downvotes: tally("downvote"),
+        }, synchronize_session=False)
+        db.query(models.Answer).filter(models.Answer.id.in_(ids)).update({
+            models.Answer.score: models.Answer.upvotes - models.Answer.downvotes,
+        }, synchronize_session=False)
+        db.commit()
+        last_id = ids[-1]
+        reconciled += len(ids)
+    return reconciled
 
 def get_user_vote(db: Session, user_id: int, answer_id: int):
     vote = db.query(models.Vote).filter(
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from .pool_metrics import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
+from .write_queue import WriteQueue
 
 # Get the directory where this file is located
 current_dir = Path(__file__).parent
@@ -17,18 +21,190 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if not SQLALCHEMY_DATABASE_URL:
     SQLALCHEMY_DATABASE_URL = "sqlite:///./stackit.db"
 
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# MySQL drops idle connections after wait_timeout (8h by default); recycle well before
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Connections opened at startup so the first requests do not pay for connecting
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", str(DB_POOL_SIZE)))
+
+def get_pool_options(url: str, async_engine: bool = False):
+    """Engine keyword arguments for an instrumented, configurable pool"""
+    if make_url(url).database in (None, "", ":memory:"):
+        # In-memory SQLite keeps SQLAlchemy's single-connection pools
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# SQLite tuning profile, applied to every new connection
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = {
+    # Readers no longer block the writer (or vice versa); fsync only at checkpoints
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB rather than pages
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    # Wait for a competing writer instead of failing straight away
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+}
+# Route vote/notification writes through one writer thread on SQLite. Off by default:
+# sqlite_write_bench measured it at about half the commit rate of direct writes under
+# the tuned profile, whose busy_timeout already serialises writers
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "false").lower() in ("1", "true", "yes")
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+IS_FILE_SQLITE = IS_SQLITE and make_url(SQLALCHEMY_DATABASE_URL).database not in (None, "", ":memory:")
+
 # Create engine with appropriate connection arguments based on database type
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+if IS_SQLITE:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **get_pool_options(SQLALCHEMY_DATABASE_URL)
+    )
+    if SQLITE_TUNING:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
 else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_pool_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async drivers for the same database, used by the async route handlers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str):
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend])
+
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **get_pool_options(SQLALCHEMY_DATABASE_URL, async_engine=True)
+)
+if IS_SQLITE and SQLITE_TUNING:
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+# Objects stay usable after commit; lazy loads are not possible on an AsyncSession
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def _create_writer_engine(url: str):
+    """One-connection engine whose transactions take SQLite's write lock up front"""
+    writer_engine = create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=1, max_overflow=0
+    )
+
+    @event.listens_for(writer_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        if SQLITE_TUNING:
+            apply_sqlite_pragmas(dbapi_connection, connection_record)
+        # Let SQLAlchemy emit BEGIN itself instead of the driver's deferred BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(writer_engine, "begin")
+    def _begin(connection):
+        # BEGIN IMMEDIATE waits out busy_timeout for the lock rather than failing mid-transaction
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return writer_engine
+
+# In-memory databases are private to a connection, so they cannot use a separate writer
+write_queue = None
+if IS_FILE_SQLITE and SQLITE_WRITE_QUEUE:
+    writer_engine = _create_writer_engine(SQLALCHEMY_DATABASE_URL)
+    write_queue = WriteQueue(
+        sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=writer_engine)
+    )
+
 # Database dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async database dependency for `async def` handlers. Sync crud helpers can be
+# reused without blocking the event loop via `await db.run_sync(crud.fn, ...)`.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Commit ``fn(session, ...)`` as one write. On SQLite it runs on the single-writer
+# queue with its own session, so ``db`` must not hold uncommitted writes; returned
+# ORM objects are detached but keep their loaded attributes.
+async def run_write(db: AsyncSession, fn, *args, **kwargs):
+    if write_queue is not None:
+        return await write_queue.run_async(fn, *args, **kwargs)
+    result = await db.run_sync(fn, *args, **kwargs)
+    await db.commit()
+    return result
+
+def run_write_sync(db, fn, *args, **kwargs):
+    if write_queue is not None:
+        return write_queue.run(fn, *args, **kwargs)
+    result = fn(db, *args, **kwargs)
+    db.commit()
+    return result
+
+def warm_pool(count: int = DB_POOL_WARM):
+    """Open ``count`` connections up front and return them to the pool"""
+    connections = [engine.connect() for _ in range(min(count, DB_POOL_SIZE))]
+    for connection in connections:
+        connection.close()
+
+async def warm_async_pool(count: int = DB_POOL_WARM):
+    connections = [await async_engine.connect() for _ in range(min(count, DB_POOL_SIZE))]
+    for connection in connections:
+        await connection.close()
+
+class QueryCounter:
+    """Counts SQL statements on every engine the app uses while entered.
+
+    Shared by the test suite's statement budgets and benchmarks.load, so the two
+    always count the same engines.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def _engines(self):
+        engines = [engine, async_engine.sync_engine]
+        if write_queue is not None:
+            engines.append(writer_engine)
+        return engines
+
+    def _count(self, conn, cursor, statement, *args):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for counted in self._engines():
+            event.listen(counted, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        for counted in self._engines():
+            event.remove(counted, "before_cursor_execute", self._count)
@@ -0,0 +1,73 @@
+"""Maintain question_hot_scores, the materialized ranking behind GET /questions/hot.
+
+    python -m app.hot_questions          # score questions changed since the last run
+    python -m app.hot_questions --full   # rescore every question
+
+The rank is log10 of a question's activity plus its creation time divided by
+HOT_DECAY_SECONDS, so newer questions need less activity to rank as high. Age
+is baked in when a score is computed, so scores never need refreshing just
+because time passed: only questions whose thread changed (questions.updated_at
+moved) are rescored. The app does that every HOT_REFRESH_INTERVAL seconds (0 disables it).
+"""
+import asyncio
+import logging
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+from .database import SessionLocal, run_write_sync
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+HOT_REFRESH_INTERVAL = float(os.getenv("HOT_REFRESH_INTERVAL", "30"))
+HOT_REFRESH_BATCH = int(os.getenv("HOT_REFRESH_BATCH", "500"))
+# Changes this close to the watermark are rescored again, covering writes whose
+# updated_at was stamped before, but committed after, the previous refresh read
+HOT_REFRESH_OVERLAP = float(os.getenv("HOT_REFRESH_OVERLAP", "60"))
+# Seconds of age that cost as much rank as a 10x drop in activity
+HOT_DECAY_SECONDS = float(os.getenv("HOT_DECAY_SECONDS", "45000"))
+HOT_VOTE_WEIGHT = float(os.getenv("HOT_VOTE_WEIGHT", "1"))
+HOT_ANSWER_WEIGHT = float(os.getenv("HOT_ANSWER_WEIGHT", "2"))
+HOT_ACCEPT_WEIGHT = float(os.getenv("HOT_ACCEPT_WEIGHT", "3"))
+
+EPOCH = datetime(2024, 1, 1)
+
+
+def hot_score(net_votes: int, answer_count: int, accepted: bool, created_at: datetime):
+    activity = (net_votes * HOT_VOTE_WEIGHT + answer_count * HOT_ANSWER_WEIGHT
+                + (HOT_ACCEPT_WEIGHT if accepted else 0))
+    sign = (activity > 0) - (activity < 0)
+    return sign * math.log10(max(abs(activity), 1)) + (created_at - EPOCH).total_seconds() / HOT_DECAY_SECONDS
+
+
+def refresh(full: bool = False, batch_size: int = HOT_REFRESH_BATCH):
+    """Rescore changed questions (all of them with ``full``); returns how many were scored"""
+    db = SessionLocal()
+    try:
+        since = None if full else crud.get_hot_watermark(db)
+        if since is not None:
+            since -= timedelta(seconds=HOT_REFRESH_OVERLAP)
+        total, position = 0, None
+        while True:
+            scored, position = run_write_sync(
+                db, crud.refresh_hot_scores, hot_score, since=since, position=position, batch_size=batch_size
+            )
+            total += scored
+            if position is None:
+                return total
+    finally:
+        db.close()
+
+
+async def refresh_periodically(interval: float = HOT_REFRESH_INTERVAL):
+    while True:
+        try:
+            await asyncio.to_thread(refresh)
+        except Exception:
+            logger.exception("Hot score refresh failed")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    print(f"Scored {refresh(full='--full' in sys.argv[1:])} questions")
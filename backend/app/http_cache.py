@@ -0,0 +1,64 @@
+import os
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+
+# Thread reads are public: browsers revalidate every time (a cheap 304), while a
+# shared cache / CDN may serve its copy for s-maxage seconds before asking again
+THREAD_CACHE_CONTROL = os.getenv(
+    "THREAD_CACHE_CONTROL", "public, max-age=0, s-maxage=10, stale-while-revalidate=30"
+)
+
+
+def thread_etag(version: int, updated_at):
+    # Weak: the same version may be sent compressed or not. The timestamp keeps a
+    # new question that reuses a deleted one's id from matching its old ETags.
+    stamp = int(updated_at.replace(tzinfo=timezone.utc).timestamp() * 1_000_000) if updated_at else 0
+    return f'W/"{version}-{stamp:x}"'
+
+
+def _etag_matches(header: str, etag: str):
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, updated_at):
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def cached_json(body: bytes, response: Response):
+    """Send pre-serialized JSON with the validators ``conditional_get`` set on ``response``"""
+    headers = {
+        name: response.headers[name] for name in ("etag", "last-modified", "cache-control") if name in response.headers
+    }
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def conditional_get(request: Request, response: Response, version: int, updated_at):
+    """Set validators on ``response``; return a 304 response if the client's copy is current.
+
+    Call with the version read *before* loading the thread: a concurrent write
+    then makes the body newer than the ETag, which only costs one extra 200.
+    """
+    headers = {"ETag": thread_etag(version, updated_at), "Cache-Control": THREAD_CACHE_CONTROL}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since and updated_at) and _not_modified_since(if_modified_since, updated_at)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
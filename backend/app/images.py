@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "local" (files under IMAGE_LOCAL_DIR, served at IMAGE_BASE_URL) or "cloudinary"
+IMAGE_STORAGE = os.getenv("IMAGE_STORAGE", "cloudinary" if os.getenv("CLOUDINARY_CLOUD_NAME") else "local")
+IMAGE_LOCAL_DIR = os.getenv("IMAGE_LOCAL_DIR", "./media")
+IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/media")
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 1)))
+IMAGE_EXECUTOR = os.getenv("IMAGE_EXECUTOR", "process")
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+# Rejects decompression bombs: a small file that expands to a huge bitmap
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+
+# Variant name -> longest side in pixels; "original" is only capped, never enlarged
+VARIANTS = {
+    "thumb": 320,
+    "medium": 1024,
+    "original": 2560,
+}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _render_variants(data: bytes, variants: dict, quality: int, max_pixels: int):
+    """Decode once and encode each variant as WebP. Runs in a worker process.
+
+    Re-encoding drops EXIF/XMP/ICC metadata (GPS position, camera serials); the EXIF
+    orientation is applied to the pixels first so images are not left rotated.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source.load()
+            image = ImageOps.exif_transpose(source)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise InvalidImage("Unsupported or corrupt image")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    rendered = {}
+    for name, longest_side in variants.items():
+        variant = image.copy()
+        variant.thumbnail((longest_side, longest_side), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, "WEBP", quality=quality, method=4)
+        rendered[name] = buffer.getvalue()
+    return rendered
+
+
+class LocalStorage:
+    """Stores variants on the local filesystem; the app serves them under ``base_url``"""
+
+    def __init__(self, root: str = IMAGE_LOCAL_DIR, base_url: str = IMAGE_BASE_URL):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def exists(self, key: str):
+        return (self.root / key).is_file()
+
+    def save(self, key: str, data: bytes):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        partial = path.with_name(path.name + ".part")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    def url(self, key: str):
+        return f"{self.base_url}/{key}"
+
+
+class CloudinaryStorage:
+    """Stores variants as Cloudinary assets under ``folder``"""
+
+    def __init__(self, folder: str = "stackit"):
+        from . import cloudinary_utils  # noqa: F401 (configures the SDK)
+        import cloudinary
+
+        self.cloudinary = cloudinary
+        self.folder = folder
+
+    def _public_id(self, key: str):
+        return f"{self.folder}/{key.rsplit('.', 1)[0]}"
+
+    def exists(self, key: str):
+        import cloudinary.api
+        import cloudinary.exceptions
+
+        try:
+            cloudinary.api.resource(self._public_id(key))
+            return True
+        except cloudinary.exceptions.NotFound:
+            return False
+
+    def save(self, key: str, data: bytes):
+        import cloudinary.uploader
+
+        cloudinary.uploader.upload(
+            io.BytesIO(data), public_id=self._public_id(key), overwrite=False, resource_type="image"
+        )
+
+    def url(self, key: str):
+        return self.cloudinary.CloudinaryImage(self._public_id(key)).build_url(secure=True, format="webp")
+
+
+class ImagePipeline:
+    """Content-addressed ingestion: hash, dedupe, render variants off-thread, store.
+
+    The same bytes always map to the same keys, so a re-upload costs one existence
+    check and stored variants can be cached by clients forever.
+    """
+
+    def __init__(self, storage, workers: int = IMAGE_WORKERS, executor: str = IMAGE_EXECUTOR,
+                 variants: dict = None, quality: int = IMAGE_WEBP_QUALITY):
+        self.storage = storage
+        self.workers = workers
+        self.executor_kind = executor
+        self.variants = variants or VARIANTS
+        self.quality = quality
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = {}  # content hash -> Task
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image")
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def keys(self, digest: str):
+        return {name: f"{digest[:2]}/{digest}/{name}.webp" for name in self.variants}
+
+    def urls(self, digest: str):
+        return {name: self.storage.url(key) for name, key in self.keys(digest).items()}
+
+    async def ingest(self, data: bytes):
+        """Return ``{"hash", "urls", "deduplicated"}`` for an uploaded image"""
+        if len(data) > IMAGE_MAX_BYTES:
+            raise InvalidImage(f"Image is larger than {IMAGE_MAX_BYTES} bytes")
+        digest = hashlib.sha256(data).hexdigest()
+        task = self._in_flight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._store(digest, data))
+            self._in_flight[digest] = task
+            task.add_done_callback(lambda done: self._in_flight.pop(digest, None))
+        deduplicated = await asyncio.shield(task)
+        return {"hash": digest, "urls": self.urls(digest), "deduplicated": deduplicated}
+
+    async def _store(self, digest: str, data: bytes):
+        keys = self.keys(digest)
+        # Variants are saved in VARIANTS order, so if the last one exists they all do
+        last_key = keys[list(keys)[-1]]
+        if await asyncio.to_thread(self.storage.exists, last_key):
+            return True
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(
+            self.get_executor(), _render_variants, data, self.variants, self.quality, IMAGE_MAX_PIXELS
+        )
+        for name, key in keys.items():
+            await asyncio.to_thread(self.storage.save, key, rendered[name])
+        return False
+
+
+def create_storage():
+    if IMAGE_STORAGE == "cloudinary":
+        return CloudinaryStorage()
+    return LocalStorage()
+
+
+pipeline = ImagePipeline(create_storage())
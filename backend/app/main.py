@@ -1,17 +1,62 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
-from .routes import auth, questions, answers, comments, notifications, votes, ai
+from .database import engine, warm_pool, warm_async_pool, write_queue
+from . import passwords, ai_jobs, images
+from .reconcile_unread import reconcile_periodically, UNREAD_RECONCILE_INTERVAL
+from .notification_retention import purge_periodically, NOTIFICATION_RETENTION_DAYS, NOTIFICATION_RETENTION_INTERVAL
+from .notification_coalescer import coalescer
+from .hot_questions import refresh_periodically as refresh_hot_periodically, HOT_REFRESH_INTERVAL
+from .search import maintain_periodically as maintain_search_index
+from .migrations import run_migrations
+from .routes import auth, questions, answers, comments, notifications, votes, ai, admin
+from .routes import images as image_routes
 from .routes import auth, questions, answers, comments
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create missing tables and apply pending schema migrations
+run_migrations(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open pooled connections before the first request arrives
+    warm_pool()
+    await warm_async_pool()
+    reconciler = None
+    if UNREAD_RECONCILE_INTERVAL > 0:
+        reconciler = asyncio.create_task(reconcile_periodically())
+    retention = None
+    if NOTIFICATION_RETENTION_DAYS > 0 and NOTIFICATION_RETENTION_INTERVAL > 0:
+        retention = asyncio.create_task(purge_periodically())
+    flusher = None
+    if coalescer.enabled:
+        flusher = asyncio.create_task(notifications.flush_coalesced_periodically())
+    hot_refresher = None
+    if HOT_REFRESH_INTERVAL > 0:
+        hot_refresher = asyncio.create_task(refresh_hot_periodically())
+    # Builds the search index in the background, then keeps it caught up
+    search_indexer = asyncio.create_task(maintain_search_index())
+    yield
+    for task in (reconciler, retention, flusher, hot_refresher, search_indexer):
+        if task is not None:
+            task.cancel()
+    # Write out notifications still waiting in the coalescing buffer
+    if flusher is not None:
+        await asyncio.to_thread(notifications.flush_coalesced_notifications)
+    # Let queued SQLite writes finish before the process exits
+    if write_queue is not None:
+        write_queue.shutdown()
+    passwords.shutdown()
+    await ai_jobs.queue.stop()
+    images.pipeline.shutdown()
 
 app = FastAPI(
     title="StackIt API",
     description="A Stack Overflow-like Q&A platform API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -31,6 +76,17 @@ app.include_router(comments.router)
 app.include_router(notifications.router)
 app.include_router(votes.router)
 app.include_router(ai.router)
+app.include_router(admin.router)
+app.include_router(image_routes.router)
+
+# Locally stored image variants are served by the app itself
+if images.IMAGE_STORAGE == "local":
+    os.makedirs(images.IMAGE_LOCAL_DIR, exist_ok=True)
+    app.mount(
+        images.IMAGE_BASE_URL,
+        image_routes.ImmutableStaticFiles(directory=images.IMAGE_LOCAL_DIR),
+        name="media"
+    )
 
 @app.get("/")
 def root():
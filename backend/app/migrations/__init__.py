@@ -0,0 +1,90 @@
+"""Versioned schema migrations.
+
+Tables that do not exist yet are created straight from the models; migrations
+then evolve existing tables. Applied versions are recorded in
+``schema_migrations``. Run ahead of a deploy with ``python -m app.migrations``;
+the app also applies pending migrations on startup.
+"""
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text
+from ..database import Base, engine as default_engine
+from .. import models  # noqa: F401  (registers the tables on Base.metadata)
+from . import m0001_hot_path_indexes, m0002_answer_vote_tallies, m0003_question_tags, m0004_unread_counters
+from . import m0005_notification_retention, m0006_notification_actor_count
+from . import m0007_question_versions, m0008_hot_questions, m0009_broadcast_unread_tally
+from . import m0010_unread_versions
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    m0001_hot_path_indexes,
+    m0002_answer_vote_tallies,
+    m0003_question_tags,
+    m0004_unread_counters,
+    m0005_notification_retention,
+    m0006_notification_actor_count,
+    m0007_question_versions,
+    m0008_hot_questions,
+    m0009_broadcast_unread_tally,
+    m0010_unread_versions,
+]
+
+LOCK_NAME = "stackit_schema_migrations"
+LOCK_TIMEOUT = 300
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255)),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+
+@contextmanager
+def _migration_lock(engine):
+    """Serialize migration runs across app instances (MySQL advisory lock)"""
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                                {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}).scalar()
+        if acquired != 1:
+            raise RuntimeError("Timed out waiting for another instance to finish migrating")
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        return {row.version for row in conn.execute(schema_migrations.select())}
+
+
+def pending_migrations(engine):
+    applied = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.VERSION not in applied]
+
+
+def run_migrations(engine=None):
+    """Create missing tables and apply pending migrations; returns the versions applied"""
+    engine = engine or default_engine
+    applied = []
+    with _migration_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        metadata.create_all(bind=engine)
+        for migration in pending_migrations(engine):
+            logger.info("Applying migration %04d: %s", migration.VERSION, migration.DESCRIPTION)
+            migration.upgrade(engine)
+            with engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(
+                    version=migration.VERSION,
+                    description=migration.DESCRIPTION,
+                    applied_at=datetime.utcnow()
+                ))
+            applied.append(migration.VERSION)
+    return applied
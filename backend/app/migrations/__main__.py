@@ -0,0 +1,17 @@
+"""python -m app.migrations [status]"""
+import logging
+import sys
+from . import MIGRATIONS, applied_versions, metadata, run_migrations
+from ..database import engine
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if sys.argv[1:] == ["status"]:
+        metadata.create_all(bind=engine)
+        applied = applied_versions(engine)
+        for migration in MIGRATIONS:
+            state = "applied" if migration.VERSION in applied else "pending"
+            print(f"{migration.VERSION:04d} {state:8} {migration.DESCRIPTION}")
+    else:
+        versions = run_migrations(engine)
+        print(f"Applied {len(versions)} migration(s)" + (f": {versions}" if versions else ""))
@@ -0,0 +1,49 @@
+"""Hot-path indexes and one vote per user per answer"""
+from sqlalchemy import text
+from . import ops
+
+VERSION = 1
+DESCRIPTION = "hot-path indexes and unique (user_id, answer_id) on votes"
+
+INDEXES = [
+    # (table, name, columns, unique)
+    ("questions", "ix_questions_created_at_id", ["created_at", "id"], False),
+    # Leading question_id also serves plain answers.question_id lookups
+    ("answers", "ix_answers_question_created_at_id", ["question_id", "created_at", "id"], False),
+    ("comments", "ix_comments_answer_id", ["answer_id"], False),
+    ("votes", "ix_votes_answer_id_vote_type", ["answer_id", "vote_type"], False),
+    ("notifications", "ix_notifications_user_created_at_id", ["user_id", "created_at", "id"], False),
+    ("notifications", "ix_notifications_user_read_created_at", ["user_id", "is_read", "created_at"], False),
+]
+
+DEDUPE_BATCH_SIZE = 500
+
+
+def _dedupe_votes(engine):
+    """Delete duplicate (user_id, answer_id) votes, keeping the oldest, in small batches"""
+    while True:
+        with engine.begin() as conn:
+            duplicates = conn.execute(text(
+                "SELECT user_id, answer_id, MIN(id) FROM votes "
+                "GROUP BY user_id, answer_id HAVING COUNT(*) > 1 LIMIT :limit"
+            ), {"limit": DEDUPE_BATCH_SIZE}).fetchall()
+            for user_id, answer_id, keep_id in duplicates:
+                conn.execute(text(
+                    "DELETE FROM votes WHERE user_id = :user_id AND answer_id = :answer_id AND id <> :keep_id"
+                ), {"user_id": user_id, "answer_id": answer_id, "keep_id": keep_id})
+        if len(duplicates) < DEDUPE_BATCH_SIZE:
+            return
+
+
+def upgrade(engine):
+    for table, name, columns, unique in INDEXES:
+        with engine.begin() as conn:
+            ops.create_index(conn, table, name, columns, unique=unique)
+
+    with engine.connect() as conn:
+        needs_unique = not ops.has_index(conn, "votes", "uq_votes_user_answer")
+    if needs_unique:
+        # Vote tallies are rebuilt from the surviving rows by migration 0002
+        _dedupe_votes(engine)
+        with engine.begin() as conn:
+            ops.create_index(conn, "votes", "uq_votes_user_answer", ["user_id", "answer_id"], unique=True)
@@ -0,0 +1,32 @@
+"""Denormalized vote tallies on answers"""
+from sqlalchemy import text
+from . import ops
+
+VERSION = 2
+DESCRIPTION = "answers.upvotes/downvotes/score, rebuilt from votes"
+
+BATCH_SIZE = 1000
+
+
+def upgrade(engine):
+    for column in ("upvotes", "downvotes", "score"):
+        with engine.begin() as conn:
+            ops.add_column(conn, "answers", column, "INTEGER NOT NULL DEFAULT 0")
+
+    # Plain SQL against the schema as of this version, in answer-id ranges
+    with engine.connect() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM answers")).scalar() or 0
+    for low in range(0, max_id, BATCH_SIZE):
+        with engine.begin() as conn:
+            bounds = {"low": low, "high": low + BATCH_SIZE}
+            conn.execute(text(
+                "UPDATE answers SET "
+                "upvotes = (SELECT COUNT(*) FROM votes WHERE votes.answer_id = answers.id "
+                "AND votes.vote_type = 'upvote'), "
+                "downvotes = (SELECT COUNT(*) FROM votes WHERE votes.answer_id = answers.id "
+                "AND votes.vote_type = 'downvote') "
+                "WHERE id > :low AND id <= :high"
+            ), bounds)
+            conn.execute(text(
+                "UPDATE answers SET score = upvotes - downvotes WHERE id > :low AND id <= :high"
+            ), bounds)
@@ -0,0 +1,57 @@
+"""Split legacy comma-separated Question.tags into tags/question_tags"""
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = "backfill tags and question_tags from questions.tags"
+
+BATCH_SIZE = 500
+
+
+def _parse_tags(tags):
+    # Frozen copy of crud.parse_tags as of this version
+    names = []
+    for name in (tags or "").split(","):
+        name = name.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade(engine):
+    # Plain SQL against the schema as of this version; re-running only adds missing links
+    tag_ids = {}
+    with engine.connect() as conn:
+        for tag_id, name in conn.execute(text("SELECT id, name FROM tags")):
+            tag_ids[name] = tag_id
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(text(
+                "SELECT id, tags FROM questions WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+            if not batch:
+                break
+            links = set()
+            for question_id, tags in batch:
+                for name in _parse_tags(tags):
+                    if name not in tag_ids:
+                        conn.execute(text("INSERT INTO tags (name, question_count) VALUES (:name, 0)"),
+                                     {"name": name})
+                        tag_ids[name] = conn.execute(text("SELECT id FROM tags WHERE name = :name"),
+                                                     {"name": name}).scalar()
+                    links.add((question_id, tag_ids[name]))
+            existing = set(conn.execute(text(
+                "SELECT question_id, tag_id FROM question_tags WHERE question_id > :last_id AND question_id <= :max_id"
+            ), {"last_id": last_id, "max_id": batch[-1][0]}).all())
+            rows = [{"question_id": q, "tag_id": t} for q, t in sorted(links - existing)]
+            if rows:
+                conn.execute(text("INSERT INTO question_tags (question_id, tag_id) VALUES (:question_id, :tag_id)"),
+                             rows)
+        last_id = batch[-1][0]
+
+    # Counts come from the association table, so they are exact even after an interrupted run
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE tags SET question_count = "
+            "(SELECT COUNT(*) FROM question_tags WHERE question_tags.tag_id = tags.id)"
+        ))
@@ -0,0 +1,25 @@
+"""Maintained per-user unread-notification counters"""
+from sqlalchemy import text
+from . import ops
+
+VERSION = 4
+DESCRIPTION = "notification_cursors.unread_count, rebuilt from notifications"
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        ops.add_column(conn, "notification_cursors", "unread_count", "INTEGER NOT NULL DEFAULT 0")
+
+    # Plain SQL against the schema as of this version
+    with engine.begin() as conn:
+        # Accounts created before broadcasts existed start with empty watermarks
+        conn.execute(text(
+            "INSERT INTO notification_cursors (user_id, broadcast_floor_id, broadcast_read_id, unread_count) "
+            "SELECT users.id, 0, 0, 0 FROM users "
+            "WHERE NOT EXISTS (SELECT 1 FROM notification_cursors WHERE notification_cursors.user_id = users.id)"
+        ))
+        conn.execute(text(
+            "UPDATE notification_cursors SET unread_count = "
+            "(SELECT COUNT(*) FROM notifications WHERE notifications.user_id = notification_cursors.user_id "
+            "AND notifications.is_read = :unread)"
+        ), {"unread": False})
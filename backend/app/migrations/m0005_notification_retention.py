@@ -0,0 +1,11 @@
+"""Index for the notification retention sweep"""
+from . import ops
+
+VERSION = 5
+DESCRIPTION = "index notifications (is_read, created_at) for retention"
+
+
+def upgrade(engine):
+    # notifications_archive itself is created from the models like any new table
+    with engine.begin() as conn:
+        ops.create_index(conn, "notifications", "ix_notifications_read_created_at", ["is_read", "created_at"])
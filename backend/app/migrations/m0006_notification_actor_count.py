@@ -0,0 +1,11 @@
+"""Actor counts for coalesced notifications"""
+from . import ops
+
+VERSION = 6
+DESCRIPTION = "notifications.actor_count for coalesced rows"
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        for table in ("notifications", "notifications_archive"):
+            ops.add_column(conn, table, "actor_count", "INTEGER NOT NULL DEFAULT 1")
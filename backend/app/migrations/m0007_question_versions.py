@@ -0,0 +1,13 @@
+"""Per-question version counter for conditional GETs"""
+from sqlalchemy import text
+from . import ops
+
+VERSION = 7
+DESCRIPTION = "questions.version and questions.updated_at"
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        ops.add_column(conn, "questions", "version", "INTEGER NOT NULL DEFAULT 1")
+        ops.add_column(conn, "questions", "updated_at", "DATETIME")
+        conn.execute(text("UPDATE questions SET updated_at = created_at WHERE updated_at IS NULL"))
@@ -0,0 +1,11 @@
+"""Changed-since index for the hot feed refresher"""
+from . import ops
+
+VERSION = 8
+DESCRIPTION = "index questions (updated_at, id) for hot score refreshes"
+
+
+def upgrade(engine):
+    # question_hot_scores is created from the models and filled by app.hot_questions
+    with engine.begin() as conn:
+        ops.create_index(conn, "questions", "ix_questions_updated_at_id", ["updated_at", "id"])
@@ -0,0 +1,17 @@
+"""Per-user tally of unread broadcasts, so unread counts stop scanning every broadcast"""
+from sqlalchemy import text
+from . import ops
+
+VERSION = 9
+DESCRIPTION = "notification_cursors.broadcast_counted_id and broadcast_unread"
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        ops.add_column(conn, "notification_cursors", "broadcast_counted_id", "INTEGER NOT NULL DEFAULT 0")
+        ops.add_column(conn, "notification_cursors", "broadcast_unread", "INTEGER NOT NULL DEFAULT 0")
+        # Everything up to the read watermark is read, so the tally starts there at zero
+        conn.execute(text(
+            "UPDATE notification_cursors SET broadcast_counted_id = broadcast_read_id "
+            "WHERE broadcast_counted_id < broadcast_read_id"
+        ))
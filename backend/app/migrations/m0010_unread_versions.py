@@ -0,0 +1,10 @@
+"""Per-user version of the unread count, so notification streams can skip events already counted"""
+from . import ops
+
+VERSION = 10
+DESCRIPTION = "notification_cursors.unread_version"
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        ops.add_column(conn, "notification_cursors", "unread_version", "INTEGER NOT NULL DEFAULT 0")
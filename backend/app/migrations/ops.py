@@ -0,0 +1,60 @@
+"""Idempotent schema operations shared by the migrations.
+
+Every operation inspects the live schema first, so a migration can be re-run
+after a partial failure and is a no-op on databases created fresh from the
+models. On MySQL, DDL runs as online InnoDB DDL and gives up quickly instead of
+queueing behind long transactions while holding the metadata lock.
+"""
+from sqlalchemy import inspect, text
+
+# Seconds a MySQL DDL statement may wait for the table's metadata lock
+MYSQL_LOCK_WAIT_TIMEOUT = 5
+
+
+def is_mysql(conn):
+    return conn.dialect.name == "mysql"
+
+
+def _prepare(conn):
+    if is_mysql(conn):
+        conn.execute(text(f"SET SESSION lock_wait_timeout = {MYSQL_LOCK_WAIT_TIMEOUT}"))
+
+
+def has_table(conn, table):
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn, table, column):
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def has_index(conn, table, name):
+    inspector = inspect(conn)
+    names = {i["name"] for i in inspector.get_indexes(table)}
+    names |= {u["name"] for u in inspector.get_unique_constraints(table)}
+    return name in names
+
+
+def create_index(conn, table, name, columns, unique=False):
+    if has_index(conn, table, name):
+        return False
+    _prepare(conn)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cols = ", ".join(columns)
+    if is_mysql(conn):
+        conn.execute(text(f"ALTER TABLE {table} ADD {kind} {name} ({cols}), ALGORITHM=INPLACE, LOCK=NONE"))
+    else:
+        conn.execute(text(f"CREATE {kind} {name} ON {table} ({cols})"))
+    return True
+
+
+def add_column(conn, table, column, ddl):
+    """Add ``column`` described by ``ddl`` (type, default, nullability) if missing"""
+    if has_column(conn, table, column):
+        return False
+    _prepare(conn)
+    if is_mysql(conn):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}, ALGORITHM=INPLACE, LOCK=NONE"))
+    else:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -29,10 +29,54 @@ class Question(Base):
     image_url = Column(String, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every write to the thread (answers, comments, votes, accepts); see
+    # crud.bump_question_version. Drives ETag / Last-Modified on thread reads.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     owner = relationship("User", back_populates="questions")
     answers = relationship("Answer", back_populates="question")
+    tag_links = relationship("QuestionTag", back_populates="question", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_questions_created_at_id", "created_at", "id"),
+        # Changed-since scans by the hot feed refresher
+        Index("ix_questions_updated_at_id", "updated_at", "id"),
+    )
+
+class QuestionHotScore(Base):
+    """Materialized hot-feed rank per question, maintained by app.hot_questions"""
+    __tablename__ = "question_hot_scores"
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    # Double precision: scores are ~1e4 and the feed cursor compares them exactly
+    score = Column(Float(precision=53), nullable=False)
+    # questions.updated_at the score was computed from; its max is the refresh watermark
+    source_updated_at = Column(DateTime, index=True)
+
+    __table_args__ = (Index("ix_question_hot_scores_score_question", "score", "question_id"),)
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, index=True)
+    question_count = Column(Integer, default=0)  # maintained on question writes
+
+    # Relationships
+    question_links = relationship("QuestionTag", back_populates="tag")
+
+class QuestionTag(Base):
+    __tablename__ = "question_tags"
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+
+    # Relationships
+    question = relationship("Question", back_populates="tag_links")
+    tag = relationship("Tag", back_populates="question_links")
+
+    # The primary key serves question -> tags; this serves tag -> questions
+    __table_args__ = (Index("ix_question_tags_tag_question", "tag_id", "question_id"),)
 
 class Answer(Base):
     __tablename__ = "answers"
@@ -43,6 +87,10 @@ class Answer(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     is_accepted = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Vote tallies maintained alongside every vote write; see crud.apply_vote_delta
+    upvotes = Column(Integer, default=0, server_default="0", nullable=False)
+    downvotes = Column(Integer, default=0, server_default="0", nullable=False)
+    score = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Relationships
     question = relationship("Question", back_populates="answers")
@@ -51,6 +99,9 @@ class Answer(Base):
 
     votes = relationship("Vote", back_populates="answer")
 
+    # Keyset pagination order within a question
+    __table_args__ = (Index("ix_answers_question_created_at_id", "question_id", "created_at", "id"),)
+
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -65,6 +116,8 @@ class Comment(Base):
 
     owner = relationship("User", back_populates="comments")
 
+    __table_args__ = (Index("ix_comments_answer_id", "answer_id"),)
+
 class Notification(Base):
     __tablename__ = "notifications"
     id = Column(Integer, primary_key=True, index=True)
@@ -75,10 +128,90 @@ class Notification(Base):
     related_question_id = Column(Integer, ForeignKey("questions.id"), nullable=True)
     related_answer_id = Column(Integer, ForeignKey("answers.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # People folded into this row by notification coalescing
+    actor_count = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        # Keyset pagination order per user
+        Index("ix_notifications_user_created_at_id", "user_id", "created_at", "id"),
+        # Unread lookups
+        Index("ix_notifications_user_read_created_at", "user_id", "is_read", "created_at"),
+        # Retention sweeps for old read rows across all users
+        Index("ix_notifications_read_created_at", "is_read", "created_at"),
+    )
+
+class ArchivedNotification(Base):
+    """Read notifications moved out of ``notifications`` by the retention job"""
+    __tablename__ = "notifications_archive"
+    id = Column(Integer, primary_key=True)  # id of the original notification
+    message = Column(String(500))
+    type = Column(String(50))
+    is_read = Column(Boolean, default=True)
+    user_id = Column(Integer, index=True)
+    related_question_id = Column(Integer, nullable=True)
+    related_answer_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime)
+    actor_count = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class BroadcastNotification(Base):
+    """A notification addressed to every user except the sender, stored once"""
+    __tablename__ = "broadcast_notifications"
+    id = Column(Integer, primary_key=True, index=True)
+    message = Column(String(500))
+    type = Column(String(50))  # 'new_question'
+    sender_id = Column(Integer, ForeignKey("users.id"))
+    related_question_id = Column(Integer, ForeignKey("questions.id"), nullable=True)
+    related_answer_id = Column(Integer, ForeignKey("answers.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    receipts = relationship("BroadcastReceipt", back_populates="broadcast", cascade="all, delete-orphan")
+
+    # Keyset pagination order
+    __table_args__ = (Index("ix_broadcast_notifications_created_at_id", "created_at", "id"),)
+
+class BroadcastReceipt(Base):
+    """Per-user read/dismiss marker for a broadcast notification"""
+    __tablename__ = "broadcast_receipts"
+    id = Column(Integer, primary_key=True, index=True)
+    broadcast_id = Column(Integer, ForeignKey("broadcast_notifications.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    is_read = Column(Boolean, default=False)
+    is_dismissed = Column(Boolean, default=False)
+
+    # Relationships
+    broadcast = relationship("BroadcastNotification", back_populates="receipts")
+
+    __table_args__ = (
+        UniqueConstraint("broadcast_id", "user_id", name="uq_broadcast_receipt_user"),
+        Index("ix_broadcast_receipts_user_broadcast", "user_id", "broadcast_id"),
+    )
+
+class NotificationCursor(Base):
+    """Per-user broadcast watermarks and the maintained unread-notification count.
+
+    Broadcasts with an id at or below ``broadcast_floor_id`` predate the user's
+    account and are hidden; those at or below ``broadcast_read_id`` count as read.
+    ``unread_count`` mirrors the user's unread ``notifications`` rows (broadcasts
+    excluded) and is periodically reconciled against them. ``broadcast_unread``
+    tallies the unread broadcasts with an id at or below ``broadcast_counted_id``,
+    so counting only has to look at newer ones; the reconcile job moves it forward.
+    ``unread_version`` goes up with every change to the user's unread state, and
+    push events carry it, so a stream can tell which events its count already includes.
+    """
+    __tablename__ = "notification_cursors"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    broadcast_floor_id = Column(Integer, default=0)
+    broadcast_read_id = Column(Integer, default=0)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+    broadcast_counted_id = Column(Integer, nullable=False, default=0, server_default="0")
+    broadcast_unread = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_version = Column(Integer, nullable=False, default=0, server_default="0")
+
 class Vote(Base):
     __tablename__ = "votes"
     id = Column(Integer, primary_key=True, index=True)
@@ -91,8 +224,10 @@ class Vote(Base):
     user = relationship("User", back_populates="votes")
     answer = relationship("Answer", back_populates="votes")
     
-    # Ensure one vote per user per answer
-    __table_args__ = {'sqlite_autoincrement': True}
-
-    owner = relationship("User", back_populates="comments")
+    __table_args__ = (
+        # Ensure one vote per user per answer (a unique index, so SQLite can add it later too)
+        Index("uq_votes_user_answer", "user_id", "answer_id", unique=True),
+        Index("ix_votes_answer_id_vote_type", "answer_id", "vote_type"),
+        {'sqlite_autoincrement': True},
+    )
 
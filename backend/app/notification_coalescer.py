@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+# Events of the same type on the same answer within this many seconds share one
+# notification row ("alice and 37 others upvoted your answer"); 0 disables coalescing
+NOTIFICATION_COALESCE_WINDOW = float(os.getenv("NOTIFICATION_COALESCE_WINDOW", "900"))
+# Seconds between flushes of the pending buffer, and groups written per transaction
+NOTIFICATION_COALESCE_FLUSH = float(os.getenv("NOTIFICATION_COALESCE_FLUSH", "2"))
+NOTIFICATION_COALESCE_BATCH = int(os.getenv("NOTIFICATION_COALESCE_BATCH", "200"))
+NOTIFICATION_COALESCE_TYPES = frozenset(
+    t.strip() for t in os.getenv("NOTIFICATION_COALESCE_TYPES", "vote,comment").split(",") if t.strip()
+)
+
+
+def notification_message(actor_name: str, actor_count: int, action: str):
+    if actor_count <= 1:
+        return f"{actor_name} {action}"
+    others = actor_count - 1
+    return f"{actor_name} and {others} other{'s' if others > 1 else ''} {action}"
+
+
+@dataclass
+class PendingGroup:
+    """Not yet written events for one (user, type, answer)"""
+    user_id: int
+    notification_type: str
+    related_answer_id: int
+    related_question_id: int
+    action: str
+    actor_name: str  # most recent actor, named in the message
+    new_actors: int = 0
+
+
+class NotificationCoalescer:
+    """In-memory buffer that folds bursts of similar events into pending groups.
+
+    ``add`` only touches memory, so it is safe inside a write job; groups are
+    handed out by ``drain`` and written in batches by the flusher. Each actor
+    counts once per window, so toggling a vote back and forth adds nothing.
+    """
+
+    def __init__(self, window: float = NOTIFICATION_COALESCE_WINDOW, types=NOTIFICATION_COALESCE_TYPES):
+        self.window = window
+        self.types = types
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> PendingGroup
+        self._actors = {}  # key -> (window opened at, {actor id})
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def coalesces(self, notification_type: str):
+        return self.enabled and notification_type in self.types
+
+    def add(self, user_id: int, notification_type: str, actor_id: int, actor_name: str, action: str,
+            related_question_id: int = None, related_answer_id: int = None):
+        """Buffer one event; returns False when the actor was already counted in this window"""
+        key = (user_id, notification_type, related_answer_id)
+        now = time.monotonic()
+        with self._lock:
+            opened_at, actors = self._actors.get(key, (None, None))
+            if opened_at is None or opened_at < now - self.window:
+                opened_at, actors = self._actors[key] = (now, set())
+            if actor_id in actors:
+                return False
+            actors.add(actor_id)
+            group = self._pending.get(key)
+            if group is None:
+                group = self._pending[key] = PendingGroup(
+                    user_id, notification_type, related_answer_id, related_question_id, action, actor_name
+                )
+            group.actor_name = actor_name
+            group.new_actors += 1
+            return True
+
+    def drain(self, limit: int = NOTIFICATION_COALESCE_BATCH):
+        """Remove and return up to ``limit`` pending groups, oldest first"""
+        with self._lock:
+            keys = list(self._pending)[:limit]
+            groups = [self._pending.pop(key) for key in keys]
+            if not self._pending:
+                cutoff = time.monotonic() - self.window
+                for key in [key for key, (opened_at, _) in self._actors.items() if opened_at < cutoff]:
+                    del self._actors[key]
+            return groups
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+
+coalescer = NotificationCoalescer()
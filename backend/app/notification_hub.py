@@ -0,0 +1,89 @@
+import asyncio
+import os
+import threading
+from collections import defaultdict
+
+# Events buffered per connection before the oldest are dropped and the client is told to resync
+NOTIFICATION_STREAM_BUFFER = int(os.getenv("NOTIFICATION_STREAM_BUFFER", "100"))
+# Seconds of silence after which a heartbeat is sent to keep proxies from closing the stream
+NOTIFICATION_STREAM_HEARTBEAT = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))
+
+
+class Subscription:
+    """One connected client: a bounded event buffer owned by the connection's event loop"""
+
+    def __init__(self, user_id: int, loop, buffer_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        # Set when events were dropped; the stream then tells the client to refetch
+        self.overflowed = False
+
+    def _put(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.overflowed = True
+        self.queue.put_nowait(event)
+
+    async def next_event(self, timeout: float):
+        """The next event, or None after ``timeout`` seconds without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NotificationHub:
+    """In-process pub/sub from notification writes to connected clients.
+
+    ``publish`` may be called from any thread (request threadpool, the SQLite
+    writer, the event loop); delivery is handed to each subscriber's loop.
+    """
+
+    def __init__(self, buffer_size: int = NOTIFICATION_STREAM_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscriptions = defaultdict(set)  # user id -> {Subscription}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int):
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, user_id: int, event: dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        self._deliver(subscriptions, event)
+
+    def publish_all(self, event: dict, exclude_user_id: int = None):
+        with self._lock:
+            subscriptions = [
+                subscription
+                for user_id, user_subscriptions in self._subscriptions.items() if user_id != exclude_user_id
+                for subscription in user_subscriptions
+            ]
+        self._deliver(subscriptions, event)
+
+    def _deliver(self, subscriptions, event: dict):
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # The connection's loop has closed; its stream is already gone
+                self.unsubscribe(subscription)
+
+
+hub = NotificationHub()
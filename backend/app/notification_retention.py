@@ -0,0 +1,57 @@
+"""Move read notifications older than NOTIFICATION_RETENTION_DAYS out of ``notifications``.
+
+    python -m app.notification_retention
+
+Rows go to ``notifications_archive`` (NOTIFICATION_RETENTION_MODE=archive) or are
+dropped (=delete). Work is done in batches of NOTIFICATION_RETENTION_BATCH rows, each
+its own short transaction, so user writes are never stuck behind one long sweep.
+The app also runs this every NOTIFICATION_RETENTION_INTERVAL seconds (0 disables it).
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from .database import SessionLocal, run_write_sync
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_RETENTION_DAYS = float(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_RETENTION_MODE = os.getenv("NOTIFICATION_RETENTION_MODE", "archive")
+NOTIFICATION_RETENTION_BATCH = int(os.getenv("NOTIFICATION_RETENTION_BATCH", "500"))
+# Seconds to sleep between batches, leaving the database to other writers
+NOTIFICATION_RETENTION_PAUSE = float(os.getenv("NOTIFICATION_RETENTION_PAUSE", "0.05"))
+NOTIFICATION_RETENTION_INTERVAL = float(os.getenv("NOTIFICATION_RETENTION_INTERVAL", "3600"))
+
+
+def purge(days: float = NOTIFICATION_RETENTION_DAYS, batch_size: int = NOTIFICATION_RETENTION_BATCH,
+          pause: float = NOTIFICATION_RETENTION_PAUSE, archive: bool = NOTIFICATION_RETENTION_MODE == "archive"):
+    """Run batches until none are left; returns the number of notifications removed"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            removed = run_write_sync(db, crud.purge_read_notifications, cutoff, batch_size, archive)
+            total += removed
+            if removed < batch_size:
+                return total
+            time.sleep(pause)
+    finally:
+        db.close()
+
+
+async def purge_periodically(interval: float = NOTIFICATION_RETENTION_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(purge)
+            if removed:
+                logger.info("Retention removed %d read notifications", removed)
+        except Exception:
+            logger.exception("Notification retention failed")
+
+
+if __name__ == "__main__":
+    print(f"Removed {purge()} read notifications")
@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, id: int, kind: int = 0):
+    """Opaque cursor pointing at the last row of a page"""
+    raw = json.dumps([created_at.isoformat(), kind, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return ``(created_at, kind, id)`` or raise InvalidCursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, kind, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(kind), int(id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def encode_score_cursor(score: float, id: int):
+    """Cursor for listings ordered by a numeric score instead of created_at"""
+    raw = json.dumps([score, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str):
+    """Return ``(score, id)`` or raise InvalidCursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), int(id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_filter(query, created_col, id_col, cursor, descending: bool = True, kind: int = 0):
+    """Restrict ``query`` to rows after ``cursor`` in (created_at, kind, id) order.
+
+    ``kind`` distinguishes row sources that are merged into one listing (e.g.
+    notifications and broadcasts); single-source listings leave it at 0.
+    """
+    if cursor is None:
+        return query
+    created_at, cursor_kind, cursor_id = cursor
+    after = created_col < created_at if descending else created_col > created_at
+    same_time = created_col == created_at
+    if kind == cursor_kind:
+        tie_break = id_col < cursor_id if descending else id_col > cursor_id
+        return query.filter(or_(after, and_(same_time, tie_break)))
+    if (kind < cursor_kind) == descending:
+        # This source sorts after the cursor row at an equal timestamp
+        return query.filter(or_(after, same_time))
+    return query.filter(after)
+
+
+def order_by_keyset(query, created_col, id_col, descending: bool = True):
+    if descending:
+        return query.order_by(created_col.desc(), id_col.desc())
+    return query.order_by(created_col.asc(), id_col.asc())
+
+
+def paginate(query, created_col, id_col, limit: int, cursor: str = None, descending: bool = True):
+    """Return ``(rows, next_cursor)`` for one keyset page of ``query``"""
+    position = decode_cursor(cursor) if cursor else None
+    query = keyset_filter(query, created_col, id_col, position, descending)
+    rows = order_by_keyset(query, created_col, id_col, descending).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
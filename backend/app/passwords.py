@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from passlib.hash import bcrypt
+
+# bcrypt cost factor for new hashes; existing hashes are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Hashing runs in worker processes so a login storm cannot starve request threads
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _hash(password: str, rounds: int):
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, hashed: str):
+    return bcrypt.verify(password, hashed)
+
+
+def get_executor():
+    """The bounded hashing pool, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if PASSWORD_HASH_EXECUTOR == "process":
+                # spawn: forking a server process that already runs threads is unsafe
+                _executor = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                )
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def hash_password(password: str, rounds: int = None):
+    """Hash on the worker pool; blocks only the calling thread"""
+    return get_executor().submit(_hash, password, rounds or BCRYPT_ROUNDS).result()
+
+
+def verify_password(password: str, hashed: str):
+    return get_executor().submit(_verify, password, hashed).result()
+
+
+def needs_rehash(hashed: str):
+    """True when ``hashed`` was made with a different cost or an outdated bcrypt variant"""
+    return bcrypt.using(rounds=BCRYPT_ROUNDS).needs_update(hashed)
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from . import models
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user; safe to share across requests"""
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: models.User):
+        return cls(id=user.id, username=user.username, email=user.email, is_admin=bool(user.is_admin))
+
+
+class PrincipalCache:
+    """Bounded LRU of principals keyed by token subject, with per-entry TTL"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # subject -> (expires_at, principal)
+        self._lock = threading.Lock()
+
+    def get(self, subject: str):
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return principal
+
+    def set(self, subject: str, principal: Principal):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    max_size=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    """Evict a user whose account row changed (admin flag, password, deletion, ...)"""
+    principal_cache.invalidate(target.email)
+
+
+@event.listens_for(models.User.email, "set", active_history=True)
+def _invalidate_previous_email(target, value, oldvalue, initiator):
+    # Tokens carry the email as subject, so a changed address must evict the old key
+    if isinstance(oldvalue, str):
+        principal_cache.invalidate(oldvalue)
@@ -0,0 +1,40 @@
+"""Correct drifted notification_cursors.unread_count values from the notifications table,
+and fold the broadcasts sent since the last run into each user's unread-broadcast tally.
+
+    python -m app.reconcile_unread
+
+The app also runs this every UNREAD_RECONCILE_INTERVAL seconds (0 disables it).
+"""
+import asyncio
+import logging
+import os
+from .database import SessionLocal
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+UNREAD_RECONCILE_INTERVAL = float(os.getenv("UNREAD_RECONCILE_INTERVAL", "3600"))
+
+
+def reconcile():
+    db = SessionLocal()
+    try:
+        crud.advance_broadcast_tallies(db)
+        return crud.reconcile_unread_counts(db)
+    finally:
+        db.close()
+
+
+async def reconcile_periodically(interval: float = UNREAD_RECONCILE_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            corrected = await asyncio.to_thread(reconcile)
+            if corrected:
+                logger.warning("Corrected %d drifted unread counters", corrected)
+        except Exception:
+            logger.exception("Unread counter reconciliation failed")
+
+
+if __name__ == "__main__":
+    print(f"Corrected {reconcile()} unread counters")
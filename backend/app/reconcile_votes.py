@@ -0,0 +1,14 @@
+"""Rebuild the denormalized Answer.upvotes/downvotes/score columns from the votes table.
+
+    python -m app.reconcile_votes
+"""
+from .database import SessionLocal
+from . import crud
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Reconciled vote counts for {crud.reconcile_vote_counts(db)} answers")
+    finally:
+        db.close()
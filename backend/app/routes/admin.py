@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from ..auth_utils import get_current_admin_user
+from ..database import engine, async_engine
+from ..pool_metrics import pool_status
+from ..thread_cache import thread_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/pool")
+def get_pool_stats(current_user=Depends(get_current_admin_user)):
+    """Live connection pool occupancy and checkout wait times (admin only)"""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine),
+    }
+
+@router.get("/cache")
+def get_cache_stats(current_user=Depends(get_current_admin_user)):
+    """Thread cache hit/miss/eviction counters and size (admin only)"""
+    return thread_cache.stats()
@@ -1,39 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db, AsyncSessionLocal
 from ..models import Question, User
-from ..auth_utils import get_current_user
+from ..auth_utils import get_current_user, get_stream_user
 from ..crud import create_answer
-from .. import schemas
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from ..ai import AIClient, AITimeout, get_ai_client, question_fingerprint, answer_prompt, suggestion_prompt
+from ..sse import sse_event
+from .. import schemas, ai_jobs
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
-# Configure Gemini AI
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
-@router.post("/answer/{question_id}")
+@router.post("/answer/{question_id}", status_code=status.HTTP_202_ACCEPTED)
 async def generate_ai_answer(
     question_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    ai_client: AIClient = Depends(get_ai_client)
 ):
-    """Generate an AI answer for a question using Gemini"""
-    
-    if not GEMINI_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="AI service is not configured"
-        )
+    """Queue generation of an AI answer; poll GET /ai/jobs/{job_id} for the result"""
     
     # Get the question
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.get(Question, question_id)
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,68 +29,109 @@ async def generate_ai_answer(
         )
     
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Prepare prompt for the question
-        prompt = f"""
-        You are a helpful programming assistant. Please provide a detailed and accurate answer to the following question:
-        
-        Title: {question.title}
-        Description: {question.description}
-        Tags: {question.tags}
-        
-        Please provide:
-        1. A clear explanation of the problem
-        2. A step-by-step solution
-        3. Code examples if applicable
-        4. Best practices and recommendations
-        
-        Format your response in a clear, structured way that would be helpful for a developer.
-        """
-        
-        # Generate response
-        response = model.generate_content(prompt)
-        ai_answer = response.text
-        
-        # Create the answer in the database
-        answer_data = schemas.AnswerCreate(
-            content=ai_answer,
-            question_id=question_id
+        job, deduplicated = ai_jobs.queue.enqueue(
+            question_id=question_id,
+            user_id=current_user.id,
+            prompt=answer_prompt(question),
+            fingerprint=question_fingerprint("answer", question.title, question.description, question.tags),
+            client=ai_client
         )
-        
-        # Create a special AI user or use current user with AI tag
-        created_answer = create_answer(db=db, answer=answer_data, user_id=current_user.id)
-        
-        return {
-            "success": True,
-            "answer_id": created_answer.id,
-            "content": ai_answer,
-            "message": "AI answer generated successfully"
-        }
-        
-    except Exception as e:
+    except ai_jobs.QuotaExceeded as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    except ai_jobs.QueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": deduplicated,
+        "message": "AI answer generation queued"
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_ai_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Report the status, progress and result of a queued AI answer"""
+    job = ai_jobs.queue.get(job_id, current_user.id)
+    if not job:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating AI answer: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
         )
+    return job.to_dict()
+
+@router.post("/answer/{question_id}/stream")
+async def stream_ai_answer(
+    question_id: int,
+    current_user: User = Depends(get_stream_user),
+    ai_client: AIClient = Depends(get_ai_client)
+):
+    """Stream an AI answer as Server-Sent Events and save it once complete.
+
+    Emits ``chunk`` events ({"text"}) as tokens arrive, then ``done`` ({"answer_id"})
+    or ``error`` ({"detail"}). Nothing is saved if the client disconnects first.
+    Request-scoped sessions would stay open for the whole stream, so the question
+    is read on a session closed before streaming starts.
+    """
+    async with AsyncSessionLocal() as db:
+        question = await db.get(Question, question_id)
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    prompt = answer_prompt(question)
+    user_id = current_user.id
+    
+    async def events():
+        parts = []
+        # Uncached: every generated answer is saved, so a replay would duplicate one
+        chunks = ai_client.stream(prompt)
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield sse_event("chunk", {"text": chunk})
+        except AITimeout as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Error generating AI answer: {str(e)}"})
+            return
+        finally:
+            # On disconnect the response cancels this generator; release the provider stream
+            await chunks.aclose()
+        
+        # No session is held while streaming; save on a fresh one
+        async with AsyncSessionLocal() as session:
+            created_answer = await session.run_sync(
+                create_answer,
+                answer=schemas.AnswerCreate(content="".join(parts)),
+                question_id=question_id,
+                user_id=user_id
+            )
+        yield sse_event("done", {"answer_id": created_answer.id})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream, which would defeat the early first byte
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/suggest/{question_id}")
 async def suggest_ai_improvement(
     question_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    ai_client: AIClient = Depends(get_ai_client)
 ):
     """Suggest improvements to make the question clearer"""
     
-    if not GEMINI_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="AI service is not configured"
-        )
-    
     # Get the question
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.get(Question, question_id)
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,30 +139,10 @@ async def suggest_ai_improvement(
         )
     
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Prepare prompt for suggestions
-        prompt = f"""
-        Please analyze this programming question and suggest improvements to make it clearer and more likely to get good answers:
-        
-        Title: {question.title}
-        Description: {question.description}
-        Tags: {question.tags}
-        
-        Please provide:
-        1. Assessment of the question clarity
-        2. Suggestions for improving the title
-        3. Suggestions for improving the description
-        4. Recommended additional information to include
-        5. Better tag suggestions if applicable
-        
-        Be constructive and helpful.
-        """
-        
-        # Generate response
-        response = model.generate_content(prompt)
-        suggestions = response.text
+        suggestions = await ai_client.complete(
+            suggestion_prompt(question),
+            cache_key=question_fingerprint("suggest", question.title, question.description, question.tags)
+        )
         
         return {
             "success": True,
@@ -141,6 +150,8 @@ async def suggest_ai_improvement(
             "message": "AI suggestions generated successfully"
         }
         
+    except AITimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from .. import schemas, crud, models, database
 from ..auth_utils import get_current_user
+from ..pagination import InvalidCursor
+from ..http_cache import conditional_get, cached_json
 
 from .notifications import create_notification
 
@@ -45,20 +47,33 @@ def create_answer(
     return crud.create_answer(db=db, answer=answer, question_id=question_id, user_id=current_user.id)
 
 
-@router.get("/question/{question_id}", response_model=List[schemas.AnswerWithComments])
+@router.get("/question/{question_id}", response_model=schemas.AnswerPage)
 def get_answers_for_question(
     question_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(database.get_db)
 ):
-    """Get all answers for a specific question"""
-    question = crud.get_question_by_id(db=db, question_id=question_id)
-    if not question:
+    """Get answers for a specific question, oldest first, one keyset page at a time"""
+    version = crud.get_question_version(db=db, question_id=question_id)
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Question not found"
         )
+    not_modified = conditional_get(request, response, *version)
+    if not_modified:
+        return not_modified
     
-    return crud.get_answers_by_question(db=db, question_id=question_id)
+    try:
+        body = crud.get_answers_page_json(
+            db=db, question_id=question_id, version=version.version, limit=limit, cursor=cursor
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return cached_json(body, response)
 
 @router.get("/{answer_id}", response_model=schemas.AnswerWithComments)
 def get_answer(
@@ -66,7 +81,7 @@ def get_answer(
     db: Session = Depends(database.get_db)
 ):
     """Get a specific answer with its comments"""
-    answer = crud.get_answer_by_id(db=db, answer_id=answer_id)
+    answer = crud.get_answer_with_comments(db=db, answer_id=answer_id)
     if not answer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,36 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from .. import schemas, crud, models, database
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from .. import schemas, crud, models, database
+from .. import schemas, crud, database
+from ..auth_utils import get_current_user
+from ..principal_cache import Principal
 from jose import jwt
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
 router = APIRouter(prefix="/auth")
-security = HTTPBearer()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(database.get_db)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user = crud.get_user_by_email(db, email)
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
 @router.post("/register", response_model=schemas.UserOut)
 def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
@@ -51,15 +32,15 @@ def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
 
 @router.post("/login", response_model=schemas.Token)
 def login(form: schemas.UserLogin, db: Session = Depends(database.get_db)):
-    user = crud.get_user_by_email(db, form.email)
-    if not user or not crud.verify_password(form.password, user.password):
+    user = crud.authenticate_user(db, form.email, form.password)
+    if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     token = jwt.encode({"sub": user.email}, SECRET_KEY, algorithm=ALGORITHM)
 
     return {"access_token": token, "token_type": "bearer"}
 
 @router.get("/me", response_model=schemas.UserOut)
-def get_me(current_user: models.User = Depends(get_current_user)):
+def get_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
     return {"access_token": token, "token_type": "bearer"}
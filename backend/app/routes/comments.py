@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from .. import schemas, crud, models, database
 from ..auth_utils import get_current_user
 from .notifications import create_notification
+from ..http_cache import conditional_get, cached_json
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -35,7 +36,9 @@ def create_comment(
             message=f"{current_user.username} commented on your answer",
             notification_type="comment",
             related_answer_id=answer_id,
-            related_question_id=answer.question_id
+            related_question_id=answer.question_id,
+            actor=current_user,
+            action="commented on your answer"
         )
     
     return new_comment
@@ -46,17 +49,24 @@ def create_comment(
 @router.get("/answer/{answer_id}", response_model=List[schemas.CommentOut])
 def get_comments_for_answer(
     answer_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(database.get_db)
 ):
     """Get all comments for a specific answer"""
-    answer = crud.get_answer_by_id(db=db, answer_id=answer_id)
-    if not answer:
+    thread = crud.get_answer_thread_version(db=db, answer_id=answer_id)
+    if not thread:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Answer not found"
         )
+    question_id, version, updated_at = thread
+    not_modified = conditional_get(request, response, version, updated_at)
+    if not_modified:
+        return not_modified
     
-    return crud.get_comments_by_answer(db=db, answer_id=answer_id)
+    body = crud.get_comments_json(db=db, answer_id=answer_id, question_id=question_id, version=version)
+    return cached_json(body, response)
 
 @router.get("/{comment_id}", response_model=schemas.CommentOut)
 def get_comment(
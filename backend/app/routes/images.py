@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.staticfiles import StaticFiles
+from .. import schemas, images
+from ..auth_utils import get_current_user
+from ..models import User
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose paths are content hashes, so browsers may cache them forever"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+@router.post("/", response_model=schemas.ImageUploadOut)
+async def upload_image(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Upload an image and get URLs of its metadata-free WebP variants.
+
+    Use ``url`` (medium) for ``image_url`` on questions and answers, and
+    ``thumbnail_url`` in listings.
+    """
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be an image"
+        )
+    
+    # Read one byte past the limit so oversized uploads are rejected without buffering them
+    data = await file.read(images.IMAGE_MAX_BYTES + 1)
+    try:
+        result = await images.pipeline.ingest(data)
+    except images.InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    urls = result["urls"]
+    return {
+        "hash": result["hash"],
+        "url": urls["medium"],
+        "thumbnail_url": urls["thumb"],
+        "original_url": urls["original"],
+        "deduplicated": result["deduplicated"]
+    }
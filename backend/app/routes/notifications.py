@@ -1,38 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import Notification, User
+from typing import Optional
+from ..database import get_async_db, run_write, run_write_sync, AsyncSessionLocal, SessionLocal
+from ..models import User
+from .. import crud
 from ..crud import get_user_by_id
-from ..schemas import NotificationResponse
-from ..auth_utils import get_current_user
+from ..schemas import NotificationPage
+from ..pagination import InvalidCursor
+from ..auth_utils import get_current_user, get_stream_user
+from ..notification_hub import hub, NOTIFICATION_STREAM_HEARTBEAT
+from ..notification_coalescer import coalescer, NOTIFICATION_COALESCE_BATCH, NOTIFICATION_COALESCE_FLUSH
+from ..sse import sse_event
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=NotificationPage)
 async def get_notifications(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all notifications for the current user"""
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).all()
-    
-    return notifications
+    """Get the current user's notifications (including broadcasts), newest first"""
+    try:
+        items, next_cursor = await db.run_sync(
+            crud.get_notifications_page, current_user.id, limit=limit, cursor=cursor
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.put("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a specific notification as read"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    notification = await run_write(db, crud.mark_notification_read, notification_id, current_user.id)
     
     if not notification:
         raise HTTPException(
@@ -40,37 +52,59 @@ async def mark_notification_read(
             detail="Notification not found"
         )
     
-    notification.is_read = True
-    db.commit()
-    
     return {"message": "Notification marked as read"}
 
 @router.put("/mark-all-read")
 async def mark_all_notifications_read(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark all notifications as read for the current user"""
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update({"is_read": True})
-    
-    db.commit()
+    await run_write(db, crud.mark_all_notifications_read, current_user.id)
+    await run_write(db, crud.mark_all_broadcasts_read, current_user.id)
     
     return {"message": "All notifications marked as read"}
 
+@router.put("/broadcast/{broadcast_id}/read")
+async def mark_broadcast_read(
+    broadcast_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark a broadcast notification as read for the current user"""
+    broadcast = await run_write(db, crud.mark_broadcast_read, broadcast_id, current_user.id)
+    if not broadcast:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    return {"message": "Notification marked as read"}
+
+@router.delete("/broadcast/{broadcast_id}")
+async def dismiss_broadcast(
+    broadcast_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Dismiss a broadcast notification for the current user"""
+    broadcast = await run_write(db, crud.dismiss_broadcast, broadcast_id, current_user.id)
+    if not broadcast:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    return {"message": "Notification deleted"}
+
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific notification"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    notification = await run_write(db, crud.delete_notification, notification_id, current_user.id)
     
     if not notification:
         raise HTTPException(
@@ -78,23 +112,72 @@ async def delete_notification(
             detail="Notification not found"
         )
     
-    db.delete(notification)
-    db.commit()
-    
     return {"message": "Notification deleted"}
 
 @router.get("/unread-count")
 async def get_unread_count(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get count of unread notifications"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    return {"unread_count": await count_unread(db, current_user.id)}
+
+async def count_unread(db: AsyncSession, user_id: int):
+    # Reads the maintained counter instead of counting notification rows
+    return await db.run_sync(crud.count_unread_notifications, user_id)
+
+@router.get("/stream")
+async def stream_notifications(current_user: User = Depends(get_stream_user)):
+    """Push notification changes as Server-Sent Events instead of polling.
+
+    Opens with ``unread_count``; then ``notification``, ``read``, ``deleted`` and
+    ``all_read`` events carry an ``unread_delta`` to apply to it. ``resync`` (with a
+    fresh ``unread_count``) means buffered events were dropped: refetch the list.
+    """
+    user_id = current_user.id
+    
+    async def events():
+        # Subscribe before counting so a change in between is not lost; events the
+        # count already includes are then recognised by version and skipped
+        subscription = hub.subscribe(user_id)
+        try:
+            async with AsyncSessionLocal() as db:
+                unread_count, version, broadcast_id = await db.run_sync(crud.get_unread_state, user_id)
+            yield sse_event("unread_count", {"unread_count": unread_count})
+            while True:
+                event = await subscription.next_event(NOTIFICATION_STREAM_HEARTBEAT)
+                if subscription.overflowed:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.overflowed = False
+                    async with AsyncSessionLocal() as db:
+                        unread_count, version, broadcast_id = await db.run_sync(crud.get_unread_state, user_id)
+                    yield sse_event("resync", {"unread_count": unread_count})
+                elif event is None:
+                    # SSE comment: keeps proxies from timing out the idle connection
+                    yield ": heartbeat\n\n"
+                elif not _counted(event, version, broadcast_id):
+                    event = dict(event)
+                    event.pop("version", None)
+                    yield sse_event(event.pop("event"), event)
+        finally:
+            hub.unsubscribe(subscription)
     
-    return {"unread_count": count}
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _counted(event: dict, version: int, broadcast_id: int):
+    """Whether an unread count read at ``version`` / ``broadcast_id`` already includes this event"""
+    if event.get("version") is not None:
+        return event["version"] <= version
+    notification = event.get("notification")
+    if event["unread_delta"] and notification and notification["is_broadcast"]:
+        # New broadcasts reach every user, so they are ordered by id instead of per-user version
+        return notification["id"] <= broadcast_id
+    return False
 
 # Helper function to create notifications
 def create_notification(
@@ -103,16 +186,49 @@ def create_notification(
     message: str,
     notification_type: str,
     related_question_id: int = None,
-    related_answer_id: int = None
+    related_answer_id: int = None,
+    actor: User = None,
+    action: str = None
 ):
-    """Create a new notification"""
-    notification = Notification(
+    """Create a new notification.
+
+    Given the acting user and the ``action`` phrase, coalescible types are buffered
+    and written later by ``flush_coalesced_notifications``; this then returns None.
+    """
+    if actor is not None and action and coalescer.coalesces(notification_type):
+        coalescer.add(
+            user_id, notification_type, actor.id, actor.username, action,
+            related_question_id=related_question_id, related_answer_id=related_answer_id
+        )
+        return None
+    return run_write_sync(
+        db,
+        crud.create_notification,
         user_id=user_id,
         message=message,
-        type=notification_type,
+        notification_type=notification_type,
         related_question_id=related_question_id,
         related_answer_id=related_answer_id
     )
-    db.add(notification)
-    db.commit()
-    return notification
+
+def flush_coalesced_notifications():
+    """Write everything in the coalescing buffer, NOTIFICATION_COALESCE_BATCH groups per transaction"""
+    written = 0
+    db = SessionLocal()
+    try:
+        while True:
+            groups = coalescer.drain(NOTIFICATION_COALESCE_BATCH)
+            if not groups:
+                return written
+            written += run_write_sync(db, crud.write_notification_groups, groups, coalescer.window)
+    finally:
+        db.close()
+
+async def flush_coalesced_periodically(interval: float = NOTIFICATION_COALESCE_FLUSH):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_coalesced_notifications)
+        except Exception:
+            # The failed batch is dropped; notifications are best effort
+            logger.exception("Flushing coalesced notifications failed")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from .. import schemas, crud, models, database
+from typing import List, Optional
+from .. import schemas, crud, models, database, search
 from ..auth_utils import get_current_user
+from ..pagination import InvalidCursor
+from ..http_cache import conditional_get, cached_json
 
 router = APIRouter(prefix="/questions", tags=["questions"])
 
@@ -15,18 +17,81 @@ def create_question(
     """Create a new question"""
     return crud.create_question(db=db, question=question, user_id=current_user.id)
 
-@router.get("/", response_model=List[schemas.QuestionOut])
+@router.get("/", response_model=schemas.QuestionPage)
 def get_questions(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    tag: List[str] = Query(default=[]),
+    match: str = Query("all", pattern="^(all|any)$"),
     db: Session = Depends(database.get_db)
 ):
-    """Get all questions with pagination"""
-    return crud.get_questions(db=db, skip=skip, limit=limit)
+    """Get questions newest first, optionally filtered by tags (all/any must match).
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page.
+    """
+    try:
+        items, next_cursor = crud.get_questions(
+            db=db, limit=limit, cursor=cursor, tags=tag, match_all=(match == "all")
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/hot", response_model=schemas.HotQuestionPage)
+def get_hot_questions(
+    cursor: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+    db: Session = Depends(database.get_db)
+):
+    """Get trending questions ranked by recent votes, answers and acceptance.
+
+    Ranks come from the precomputed question_hot_scores table (see app.hot_questions),
+    so new activity shows up after the next background refresh.
+    """
+    try:
+        rows, next_cursor = crud.get_hot_questions(db=db, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    items = [
+        schemas.HotQuestionOut(**schemas.QuestionOut.model_validate(question).model_dump(), hot_score=score)
+        for question, score in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/tags", response_model=List[schemas.TagOut])
+def get_tags(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(database.get_db)
+):
+    """Get tags ordered by how many questions use them"""
+    return crud.get_tags(db=db, skip=skip, limit=limit)
+
+@router.get("/search", response_model=List[schemas.QuestionSearchResult])
+def search_questions(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(database.get_db)
+):
+    """Full-text search over question titles, descriptions and tags, best match first"""
+    if not search.index.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is still loading",
+            headers={"Retry-After": "5"}
+        )
+    results = crud.search_questions(db=db, query=q, skip=skip, limit=limit)
+    return [
+        schemas.QuestionSearchResult(**schemas.QuestionOut.model_validate(question).model_dump(), score=score)
+        for question, score in results
+    ]
 
 @router.get("/{question_id}", response_model=schemas.QuestionWithAnswers)
 def get_question(
     question_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(database.get_db)
 ):
     """Get a specific question with its answers"""
@@ -36,7 +101,12 @@ def get_question(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Question not found"
         )
-    return question
+    not_modified = conditional_get(request, response, question.version, question.updated_at)
+    if not_modified:
+        return not_modified
+
+    body = crud.get_question_thread_json(db=db, question=question)
+    return cached_json(body, response)
 
 @router.put("/{question_id}", response_model=schemas.QuestionOut)
 def update_question(
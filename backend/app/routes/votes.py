@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models import Vote, Answer, User, Notification
-from ..schemas import VoteCreate, VoteResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_async_db, run_write
+from ..models import Vote, Answer, Question, User
+from ..schemas import VoteCreate, VoteResponse, AnswerVoteSummary
 from ..auth_utils import get_current_user
-from .notifications import create_notification
+from ..crud import record_vote, get_vote_summaries
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 
@@ -12,11 +15,11 @@ router = APIRouter(prefix="/votes", tags=["votes"])
 async def create_vote(
     vote: VoteCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create or update a vote on an answer"""
     # Check if answer exists
-    answer = db.query(Answer).filter(Answer.id == vote.answer_id).first()
+    answer = await db.get(Answer, vote.answer_id)
     if not answer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -30,92 +33,69 @@ async def create_vote(
             detail="Cannot vote on your own answer"
         )
     
-    # Check if user has already voted on this answer
-    existing_vote = db.query(Vote).filter(
-        Vote.user_id == current_user.id,
-        Vote.answer_id == vote.answer_id
-    ).first()
-    
-    if existing_vote:
-        if existing_vote.vote_type == vote.vote_type:
-            # Remove vote if clicking the same vote type
-            db.delete(existing_vote)
-            db.commit()
-            return {"message": "Vote removed", "vote_type": None}
-        else:
-            # Update vote type
-            existing_vote.vote_type = vote.vote_type
-            db.commit()
-            
-            # Create notification for vote change
-            if vote.vote_type == "upvote":
-                create_notification(
-                    db=db,
-                    user_id=answer.owner_id,
-                    message=f"{current_user.username} upvoted your answer",
-                    notification_type="vote",
-                    related_answer_id=answer.id,
-                    related_question_id=answer.question_id
-                )
-            
-            return {"message": "Vote updated", "vote_type": vote.vote_type}
-    
-    # Create new vote
-    new_vote = Vote(
-        user_id=current_user.id,
-        answer_id=vote.answer_id,
-        vote_type=vote.vote_type
-    )
-    db.add(new_vote)
-    db.commit()
-    
-    # Create notification for new upvote
-    if vote.vote_type == "upvote":
-        create_notification(
-            db=db,
-            user_id=answer.owner_id,
-            message=f"{current_user.username} upvoted your answer",
-            notification_type="vote",
-            related_answer_id=answer.id,
-            related_question_id=answer.question_id
+    # Toggle, update or create the vote (and notify the owner) as one write job
+    try:
+        action = await run_write(db, record_vote, current_user.id, current_user.username, answer, vote.vote_type)
+    except IntegrityError:
+        # A concurrent request from the same user already recorded a vote
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Vote already recorded"
         )
     
-    return {"message": "Vote created", "vote_type": vote.vote_type}
+    if action == "removed":
+        return {"message": "Vote removed", "vote_type": None}
+    return {"message": f"Vote {action}", "vote_type": vote.vote_type}
 
 @router.get("/answer/{answer_id}")
 async def get_answer_votes(
     answer_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get vote statistics for an answer"""
-    # Check if answer exists
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
+    # Check if answer exists (tallies are stored on the answer row)
+    answer = await db.get(Answer, answer_id)
     if not answer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Answer not found"
         )
     
-    upvotes = db.query(Vote).filter(
-        Vote.answer_id == answer_id,
-        Vote.vote_type == "upvote"
-    ).count()
-    
-    downvotes = db.query(Vote).filter(
-        Vote.answer_id == answer_id,
-        Vote.vote_type == "downvote"
-    ).count()
-    
     # Check user's vote
-    user_vote = db.query(Vote).filter(
+    user_vote = await db.scalar(select(Vote.vote_type).where(
         Vote.answer_id == answer_id,
         Vote.user_id == current_user.id
-    ).first()
+    ))
     
     return {
-        "upvotes": upvotes,
-        "downvotes": downvotes,
-        "net_votes": upvotes - downvotes,
-        "user_vote": user_vote.vote_type if user_vote else None
+        "upvotes": answer.upvotes,
+        "downvotes": answer.downvotes,
+        "net_votes": answer.score,
+        "user_vote": user_vote
     }
+
+@router.get("/question/{question_id}", response_model=List[AnswerVoteSummary])
+async def get_question_votes(
+    question_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get vote statistics and the current user's vote for every answer on a question"""
+    question = await db.get(Question, question_id)
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    return await db.run_sync(get_vote_summaries, current_user.id, question_id=question_id)
+
+@router.get("/answers", response_model=List[AnswerVoteSummary])
+async def get_answers_votes(
+    answer_ids: List[int] = Query(..., max_length=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get vote statistics and the current user's vote for a batch of answers"""
+    return await db.run_sync(get_vote_summaries, current_user.id, answer_ids=answer_ids)
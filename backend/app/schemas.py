@@ -45,9 +45,31 @@ class QuestionOut(BaseModel):
     class Config:
         from_attributes = True
 
+class QuestionSearchResult(QuestionOut):
+    score: float
+
+class HotQuestionOut(QuestionOut):
+    hot_score: float
+
 class QuestionWithAnswers(QuestionOut):
     answers: List["AnswerOut"] = []
 
+# Tag schemas
+class TagOut(BaseModel):
+    name: str
+    question_count: int
+
+    class Config:
+        from_attributes = True
+
+# Image schemas
+class ImageUploadOut(BaseModel):
+    hash: str
+    url: str
+    thumbnail_url: str
+    original_url: str
+    deduplicated: bool
+
 # Answer schemas
 class AnswerCreate(BaseModel):
     content: str
@@ -61,6 +83,9 @@ class AnswerOut(BaseModel):
     owner_id: int
     is_accepted: bool
     created_at: datetime
+    upvotes: int = 0
+    downvotes: int = 0
+    score: int = 0
     
     class Config:
         from_attributes = True
@@ -88,9 +113,11 @@ class NotificationResponse(BaseModel):
     message: str
     type: str
     is_read: bool
+    is_broadcast: bool = False
     related_question_id: Optional[int] = None
     related_answer_id: Optional[int] = None
     created_at: datetime
+    actor_count: int = 1
 
     
     class Config:
@@ -106,6 +133,30 @@ class VoteResponse(BaseModel):
     message: str
     vote_type: Optional[str] = None
 
+class AnswerVoteSummary(BaseModel):
+    answer_id: int
+    upvotes: int
+    downvotes: int
+    net_votes: int
+    user_vote: Optional[str] = None
+
+# Keyset page schemas
+class QuestionPage(BaseModel):
+    items: List[QuestionOut]
+    next_cursor: Optional[str] = None
+
+class HotQuestionPage(BaseModel):
+    items: List[HotQuestionOut]
+    next_cursor: Optional[str] = None
+
+class AnswerPage(BaseModel):
+    items: List[AnswerWithComments]
+    next_cursor: Optional[str] = None
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+
 # Update forward references
 QuestionWithAnswers.model_rebuild()
 AnswerWithComments.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,267 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Every worker keeps its own index in memory, roughly 3KB per question (about 3GB
+# at 1M questions). It is built in the background at startup; until then
+# GET /questions/search answers 503.
+# Seconds between re-reads of questions changed by other processes (0 disables them)
+SEARCH_CATCHUP_INTERVAL = float(os.getenv("SEARCH_CATCHUP_INTERVAL", "5"))
+# Changes this close to the watermark are re-read again, covering writes whose
+# updated_at was stamped before, but committed after, the previous read
+SEARCH_CATCHUP_OVERLAP = float(os.getenv("SEARCH_CATCHUP_OVERLAP", "60"))
+
+# Field weights applied to term frequencies before BM25 saturation
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "description": 1}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i",
+    "in", "is", "it", "my", "of", "on", "or", "that", "the", "this", "to", "what",
+    "when", "why", "with",
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[._-][a-z0-9+#]+)*")
+
+
+def tokenize(text):
+    """Lowercase, strip HTML and split text into search terms"""
+    if not text:
+        return []
+    text = _TAG_RE.sub(" ", text.lower())
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def _weighted_terms(title, description, tags):
+    terms = Counter()
+    fields = {
+        "title": tokenize(title),
+        "description": tokenize(description),
+        "tags": tokenize(" ".join((tags or "").split(","))),
+    }
+    for field, tokens in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokens:
+            terms[token] += weight
+    return terms
+
+
+class SearchIndex:
+    """In-process inverted index over question title, description and tags.
+
+    ``maintain_periodically`` builds it from the database at startup. This
+    process's own question writes in ``crud`` apply straight away through
+    ``add``/``update``/``remove``; writes made by other workers are picked up by
+    ``catch_up``, which re-reads questions whose ``updated_at`` moved past the
+    index's watermark.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}   # term -> {question_id: weighted tf}
+        self._doc_terms = {}  # question_id -> terms, used to unindex on update/delete
+        self._doc_len = {}    # question_id -> weighted document length
+        self._total_len = 0.0
+        self._watermark = None  # latest questions.updated_at read from the database
+        self.loaded = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._doc_len)
+
+    def build(self, db: Session, batch_size: int = 1000):
+        """Load every question from the database into a fresh index and swap it in.
+
+        The lock is only held for the swap, so searches keep being answered from
+        the previous contents while a rebuild reads the table.
+        """
+        started = datetime.utcnow()
+        fresh = SearchIndex()
+        fresh._load(db.query(*self._columns()).yield_per(batch_size))
+        with self._lock:
+            self._postings, self._doc_terms = fresh._postings, fresh._doc_terms
+            self._doc_len, self._total_len = fresh._doc_len, fresh._total_len
+            # Questions written while the build was reading are re-read by the next catch_up
+            self._watermark = min(fresh._watermark, started) if fresh._watermark else None
+            self.loaded = True
+
+    def catch_up(self, db: Session, batch_size: int = 1000):
+        """Re-index questions changed since the watermark, including by other processes.
+
+        Rows are applied a batch at a time, so searches wait for one batch at most.
+        A row read just before this process committed a newer version of it can
+        briefly win; it is read again on the next run, while still inside the
+        overlap. Questions deleted elsewhere are not seen here;
+        ``crud.search_questions`` drops them when a search returns an id that no
+        longer exists. Returns the number of questions re-indexed.
+        """
+        if not self.loaded:
+            return 0
+        query = db.query(*self._columns())
+        if self._watermark is not None:
+            since = self._watermark - timedelta(seconds=SEARCH_CATCHUP_OVERLAP)
+            query = query.filter(models.Question.updated_at >= since)
+        rows, total = [], 0
+        for row in query.yield_per(batch_size):
+            rows.append(row)
+            if len(rows) >= batch_size:
+                total += self._apply(rows)
+        return total + self._apply(rows)
+
+    @staticmethod
+    def _columns():
+        return (models.Question.id, models.Question.title, models.Question.description,
+                models.Question.tags, models.Question.updated_at)
+
+    def _load(self, rows, reindex=False):
+        for question_id, title, description, tags, updated_at in rows:
+            if reindex:
+                self._remove(question_id)
+            self._add(question_id, title, description, tags)
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+    def _apply(self, rows):
+        with self._lock:
+            self._load(rows, reindex=True)
+        applied = len(rows)
+        rows.clear()
+        return applied
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0.0
+            self._watermark = None
+            self.loaded = False
+
+    def add(self, question: models.Question):
+        self.add_document(question.id, question.title, question.description, question.tags)
+
+    def update(self, question: models.Question):
+        self.add(question)
+
+    def remove(self, question_id: int):
+        with self._lock:
+            if self.loaded:
+                self._remove(question_id)
+
+    def add_document(self, question_id, title, description, tags):
+        """Index (or re-index) one question. No-op until the index has been built."""
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(question_id)
+            self._add(question_id, title, description, tags)
+
+    def _add(self, question_id, title, description, tags):
+        terms = _weighted_terms(title, description, tags)
+        # Interned, so every posting list key and per-document term tuple shares one string
+        doc_terms = tuple(map(sys.intern, terms))
+        for term in doc_terms:
+            self._postings.setdefault(term, {})[question_id] = terms[term]
+        self._doc_terms[question_id] = doc_terms
+        length = sum(terms.values())
+        self._doc_len[question_id] = length
+        self._total_len += length
+
+    def _remove(self, question_id):
+        terms = self._doc_terms.pop(question_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(question_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(question_id)
+
+    def search(self, query: str, limit: int = 20, skip: int = 0):
+        """Return ``[(question_id, score)]`` ranked by BM25, best first"""
+        terms = set(tokenize(query))
+        k = skip + limit
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not terms or not n_docs:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+            doc_len = self._doc_len
+            # K1 * (1 - B + B * dl / avgdl), split so the inner loop is one multiply-add
+            norm = K1 * (1 - B)
+            slope = K1 * B / avg_len
+
+            weighted = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings:
+                    df = len(postings)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    weighted.append((idf, postings))
+            # MaxScore: a term contributes at most idf * (K1 + 1). Walk terms from the
+            # most selective down; once the k-th best score beats everything the
+            # remaining terms could add, unseen documents can no longer make the top k
+            # and the common terms only need probing for existing candidates.
+            weighted.sort(key=lambda item: item[0], reverse=True)
+            remaining = sum(idf for idf, _ in weighted) * (K1 + 1)
+            scores = {}
+            for idf, postings in weighted:
+                if len(scores) >= k and heapq.nlargest(k, scores.values())[-1] >= remaining:
+                    for question_id in scores:
+                        tf = postings.get(question_id)
+                        if tf is not None:
+                            scores[question_id] += idf * tf * (K1 + 1) / (tf + norm + slope * doc_len[question_id])
+                else:
+                    for question_id, tf in postings.items():
+                        partial = idf * tf * (K1 + 1) / (tf + norm + slope * doc_len[question_id])
+                        scores[question_id] = scores.get(question_id, 0.0) + partial
+                remaining -= idf * (K1 + 1)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return top[skip:]
+
+
+# Shared index used by the question write paths and the search endpoint
+index = SearchIndex()
+
+
+def _with_session(method):
+    db = SessionLocal()
+    try:
+        return method(db)
+    finally:
+        db.close()
+
+
+async def maintain_periodically(interval: float = SEARCH_CATCHUP_INTERVAL):
+    """Build the shared index off the event loop, then catch it up every ``interval`` seconds"""
+    while not index.loaded:
+        try:
+            await asyncio.to_thread(_with_session, index.build)
+            logger.info("Search index built: %d questions", len(index))
+        except Exception:
+            logger.exception("Search index build failed")
+            await asyncio.sleep(interval or 5)
+    while interval > 0:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_with_session, index.catch_up)
+        except Exception:
+            logger.exception("Search index catch-up failed")
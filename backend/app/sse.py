@@ -0,0 +1,6 @@
+import json
+
+
+def sse_event(event: str, data: dict):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+# "memory" (per process) or "none"; other backends implement the MemoryBackend interface
+THREAD_CACHE_BACKEND = os.getenv("THREAD_CACHE_BACKEND", "memory")
+THREAD_CACHE_MAX_BYTES = int(os.getenv("THREAD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+THREAD_CACHE_TTL = float(os.getenv("THREAD_CACHE_TTL", "300"))
+
+
+class MemoryBackend:
+    """LRU + TTL store of serialized values, capped by the total bytes of keys and values.
+
+    Every entry belongs to a group (a question id) so one write can evict all the
+    cached views of its thread.
+    """
+
+    def __init__(self, max_bytes: int = THREAD_CACHE_MAX_BYTES, ttl: float = THREAD_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, group, value)
+        self._groups = defaultdict(set)  # group -> {key}
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, group):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, group, value)
+            self._groups[group].add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, group):
+        with self._lock:
+            keys = self._groups.pop(group, ())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self.bytes = 0
+
+    def _remove(self, key: str):
+        _, group, value = self._entries.pop(key)
+        self.bytes -= len(key) + len(value)
+        keys = self._groups.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class NullBackend:
+    """Caches nothing; every read goes to the database"""
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: bytes, group):
+        pass
+
+    def invalidate(self, group):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class ThreadCache:
+    """Read-through cache of serialized question threads.
+
+    Callers put the question's version in the key, so a read that races a write
+    can only store its result under a version nobody asks for again; the write
+    hooks in ``crud`` evict a question's entries to free their space early.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: str, group, load):
+        """Return the cached bytes for ``key``, or store and return ``load()``.
+
+        A ``load`` returning None (the thread is gone) is passed through uncached.
+        """
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            value = load()
+            if value is not None:
+                self.backend.set(key, value, group)
+        return value
+
+    def invalidate(self, question_id: int):
+        self.backend.invalidate(question_id)
+
+    def stats(self):
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses}
+        return {"backend": type(self.backend).__name__, **counters, **self.backend.stats()}
+
+
+def create_thread_cache():
+    if THREAD_CACHE_BACKEND == "memory":
+        return ThreadCache(MemoryBackend())
+    if THREAD_CACHE_BACKEND == "none":
+        return ThreadCache(NullBackend())
+    raise ValueError(f"Unknown THREAD_CACHE_BACKEND: {THREAD_CACHE_BACKEND}")
+
+
+thread_cache = create_thread_cache()
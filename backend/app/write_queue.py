@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class WriteQueue:
+    """Runs write transactions one at a time on a single dedicated thread.
+
+    SQLite only ever admits one writer. Funnelling this process's writes through
+    one thread (and one connection) makes them wait their turn in a queue instead
+    of racing for the database lock and failing with "database is locked".
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._thread_ident = None
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue ``fn(session, *args, **kwargs)``; the session is committed if it returns"""
+        if threading.get_ident() == self._thread_ident:
+            # Waiting on our own queue from inside a job would never finish
+            raise RuntimeError("Nested write submitted from the writer thread")
+        return self._executor.submit(self._run, fn, args, kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """Blocking submit, for sync handlers running in the threadpool"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run(self, fn, args, kwargs):
+        self._thread_ident = threading.get_ident()
+        db = self._session_factory()
+        try:
+            result = fn(db, *args, **kwargs)
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
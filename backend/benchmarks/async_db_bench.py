@@ -0,0 +1,122 @@
+"""Compare throughput of the async notification handlers before and after the AsyncSession port.
+
+"before" replays the old handler shape (``async def`` calling the sync Session, which
+blocks the event loop); "after" is the shipped ``GET /notifications/unread-count``.
+Once "before" has more concurrent clients than the sync pool has connections it
+stalls: the blocked loop waits on a checkout that only the loop itself can free.
+Run from the backend directory; point --database-url at MySQL for a networked database:
+
+    python -m benchmarks.async_db_bench --clients 200 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _setup(database_url):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+
+    from fastapi import Depends
+    from sqlalchemy.orm import Session
+    from app.main import app
+    from app import crud
+    from app.database import get_db
+    from app.auth_utils import get_current_user
+    from app.models import Notification
+
+    async def legacy_unread_count(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+        count = db.query(Notification).filter(
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        ).count()
+        count += crud.count_unread_broadcasts(db, current_user.id)
+        return {"unread_count": count}
+
+    app.add_api_route("/bench/legacy-unread-count", legacy_unread_count, methods=["GET"])
+    return app
+
+
+def _seed(users, notifications_per_user):
+    from jose import jwt
+    from app.database import SessionLocal
+    from app.models import Notification, User
+    from app.auth_utils import SECRET_KEY, ALGORITHM
+
+    db = SessionLocal()
+    try:
+        existing = db.query(User).filter(User.email.like("bench%@example.com")).count()
+        if existing < users:
+            db.add_all([
+                User(username=f"bench{i}", email=f"bench{i}@example.com", password="x", is_admin=False)
+                for i in range(existing, users)
+            ])
+            db.commit()
+            for user in db.query(User).filter(User.email.like("bench%@example.com")):
+                db.add_all([
+                    Notification(user_id=user.id, message="bench", type="answer", is_read=bool(n % 2))
+                    for n in range(notifications_per_user)
+                ])
+            db.commit()
+        emails = [email for (email,) in db.query(User.email).filter(User.email.like("bench%@example.com"))]
+    finally:
+        db.close()
+    return [jwt.encode({"sub": email}, SECRET_KEY, algorithm=ALGORITHM) for email in emails[:users]]
+
+
+async def _drive(app, path, tokens, clients, requests_per_client):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        errors = 0
+
+        async def worker(i, count):
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            for _ in range(count):
+                try:
+                    response = await client.get(path, headers=headers)
+                    errors += response.status_code != 200
+                except Exception:
+                    errors += 1
+
+        # Warm the principal cache sequentially before timing
+        for i in range(min(clients, len(tokens))):
+            await worker(i, 1)
+        errors = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, requests_per_client) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+    return (clients * requests_per_client - errors) / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--notifications", type=int, default=50, help="notifications per user")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--variant", choices=["before", "after", "both"], default="both")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    app = _setup(database_url)
+    tokens = _seed(args.users, args.notifications)
+
+    variants = {
+        "before": ("before (sync Session)", "/bench/legacy-unread-count"),
+        "after": ("after (AsyncSession)", "/notifications/unread-count"),
+    }
+    for name in (["before", "after"] if args.variant == "both" else [args.variant]):
+        label, path = variants[name]
+        rps, errors = asyncio.run(_drive(app, path, tokens, args.clients, args.requests))
+        print(f"{label:24} {rps:8.1f} ok req/s  {errors} errors  ({args.clients} concurrent clients)")
+
+
+if __name__ == "__main__":
+    main()
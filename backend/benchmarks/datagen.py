@@ -0,0 +1,192 @@
+"""Seeded synthetic data for the benchmarks: users, questions, answers, comments, votes, notifications.
+
+Rows are written with bulk Core inserts in chunks, so even the larger scales load
+in minutes on SQLite. The same ``--seed`` and ``--scale`` always produce the same
+rows. Run from the backend directory:
+
+    python -m benchmarks.datagen --scale small --database-url sqlite:///bench.db
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+SCALES = {
+    # users, questions; per-item averages are shared by every scale
+    "tiny": (50, 200),
+    "small": (500, 2_000),
+    "medium": (5_000, 20_000),
+    "large": (50_000, 200_000),
+}
+ANSWERS_PER_QUESTION = 3.0
+COMMENTS_PER_ANSWER = 1.5
+VOTES_PER_ANSWER = 4.0
+NOTIFICATIONS_PER_USER = 20.0
+PASSWORD = "benchmark-password"
+# Fixed so the same seed produces byte-identical databases across runs
+ANCHOR = datetime(2026, 1, 1)
+HISTORY = timedelta(days=90)
+TAGS = ["python", "fastapi", "sqlalchemy", "react", "javascript", "docker", "mysql",
+        "sqlite", "css", "typescript", "node.js", "c++", "rust", "go", "java"]
+CHUNK = 1000
+
+
+def _words(rng, vocab, k):
+    # Log-uniform ranks give a Zipf-like skew, so search terms have realistic frequencies
+    return " ".join(vocab[int(len(vocab) ** rng.random()) - 1] for _ in range(k))
+
+
+def _count(rng, mean, cap):
+    return min(int(rng.expovariate(1 / mean)), cap) if mean > 0 else 0
+
+
+def _insert(conn, model, rows):
+    if rows:
+        conn.execute(model.__table__.insert(), rows)
+        rows.clear()
+
+
+def generate(engine, users: int, questions: int, seed: int = 42):
+    """Fill an empty database; returns row counts per table"""
+    from app import models, passwords
+
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(5000)]
+    counts = dict.fromkeys(["users", "questions", "answers", "comments", "votes", "notifications"], 0)
+    password_hash = passwords.hash_password(PASSWORD)  # one bcrypt call, shared by every user
+
+    with engine.begin() as conn:
+        rows = []
+        for user_id in range(1, users + 1):
+            rows.append({"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@bench.local",
+                         "password": password_hash, "is_admin": user_id == 1})
+            if len(rows) >= CHUNK:
+                _insert(conn, models.User, rows)
+        _insert(conn, models.User, rows)
+        counts["users"] = users
+        _insert(conn, models.Tag, [{"id": i + 1, "name": name, "question_count": 0} for i, name in enumerate(TAGS)])
+
+    tag_counts = [0] * len(TAGS)
+    answer_id = comment_id = vote_id = 0
+    answer_ids = []  # (answer id, question id, owner id), for notifications
+    for start in range(1, questions + 1, CHUNK):
+        batch = {model: [] for model in (models.Question, models.QuestionTag, models.Answer,
+                                          models.Comment, models.Vote)}
+        for question_id in range(start, min(start + CHUNK, questions + 1)):
+            created_at = ANCHOR - HISTORY + HISTORY * (question_id / (questions + 1))
+            owner_id = rng.randint(1, users)
+            tag_indexes = rng.sample(range(len(TAGS)), rng.randint(1, 3))
+            for i in tag_indexes:
+                tag_counts[i] += 1
+                batch[models.QuestionTag].append({"question_id": question_id, "tag_id": i + 1})
+            batch[models.Question].append({
+                "id": question_id, "title": _words(rng, vocab, rng.randint(4, 10)).capitalize() + "?",
+                "description": _words(rng, vocab, rng.randint(30, 120)),
+                "tags": ",".join(TAGS[i] for i in tag_indexes), "owner_id": owner_id,
+                "created_at": created_at, "updated_at": created_at, "version": 1,
+            })
+            accepted = rng.random() < 0.3
+            for n in range(_count(rng, ANSWERS_PER_QUESTION, 40)):
+                answer_id += 1
+                answer_owner = rng.randint(1, users)
+                answered_at = created_at + timedelta(minutes=rng.randint(1, 7 * 24 * 60))
+                voters = rng.sample(range(1, users + 1), min(_count(rng, VOTES_PER_ANSWER, 200), users))
+                upvotes = downvotes = 0
+                for voter in voters:
+                    if voter == answer_owner:
+                        continue
+                    vote_type = "upvote" if rng.random() < 0.8 else "downvote"
+                    upvotes += vote_type == "upvote"
+                    downvotes += vote_type == "downvote"
+                    vote_id += 1
+                    batch[models.Vote].append({"id": vote_id, "user_id": voter, "answer_id": answer_id,
+                                               "vote_type": vote_type, "created_at": answered_at})
+                batch[models.Answer].append({
+                    "id": answer_id, "content": _words(rng, vocab, rng.randint(20, 200)),
+                    "question_id": question_id, "owner_id": answer_owner,
+                    "is_accepted": accepted and n == 0, "created_at": answered_at,
+                    "upvotes": upvotes, "downvotes": downvotes, "score": upvotes - downvotes,
+                })
+                answer_ids.append((answer_id, question_id, answer_owner))
+                for _ in range(_count(rng, COMMENTS_PER_ANSWER, 20)):
+                    comment_id += 1
+                    batch[models.Comment].append({
+                        "id": comment_id, "content": _words(rng, vocab, rng.randint(5, 30)),
+                        "answer_id": answer_id, "owner_id": rng.randint(1, users),
+                        "created_at": answered_at + timedelta(minutes=rng.randint(1, 600)),
+                    })
+        with engine.begin() as conn:
+            for model, rows in batch.items():
+                _insert(conn, model, rows)
+    counts.update(questions=questions, answers=answer_id, comments=comment_id, votes=vote_id)
+
+    with engine.begin() as conn:
+        for i, count in enumerate(tag_counts):
+            conn.execute(models.Tag.__table__.update().where(models.Tag.id == i + 1).values(question_count=count))
+        rows = []
+        notification_id = 0
+        for user_id in range(1, users + 1):
+            for _ in range(_count(rng, NOTIFICATIONS_PER_USER, 2000) if answer_ids else 0):
+                related_answer, related_question, _ = rng.choice(answer_ids)
+                notification_type = rng.choice(["answer", "comment", "vote"])
+                notification_id += 1
+                rows.append({
+                    "id": notification_id, "user_id": user_id, "type": notification_type,
+                    "message": f"user{rng.randint(1, users)} left a {notification_type}",
+                    "is_read": rng.random() < 0.7, "related_question_id": related_question,
+                    "related_answer_id": related_answer, "actor_count": 1,
+                    "created_at": ANCHOR - HISTORY * rng.random(),
+                })
+                if len(rows) >= CHUNK:
+                    _insert(conn, models.Notification, rows)
+        _insert(conn, models.Notification, rows)
+        counts["notifications"] = notification_id
+    return counts
+
+
+def prepare(database_url: str, scale: str = "small", seed: int = 42):
+    """Create the schema, generate data and build derived state (unread counters, hot scores, search index).
+
+    Must run before anything else imports ``app``: the database URL is read at import.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    # Login cost is not what these benchmarks measure; 4 is bcrypt's minimum
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+
+    from app import crud, hot_questions, search
+    from app.database import engine, SessionLocal
+    from app.migrations import run_migrations
+
+    run_migrations(engine)
+    users, questions = SCALES[scale]
+    counts = generate(engine, users, questions, seed)
+    db = SessionLocal()
+    try:
+        crud.reconcile_unread_counts(db)
+        search.index.build(db)
+    finally:
+        db.close()
+    hot_questions.refresh(full=True)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES, key=lambda s: SCALES[s]), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", required=True, help="an empty database")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = prepare(args.database_url, args.scale, args.seed)
+    print(", ".join(f"{count} {table}" for table, count in counts.items()),
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Drive the API's main endpoints in-process and record latency, throughput and query counts.
+
+Generates a seeded dataset (see benchmarks.datagen) into a temporary SQLite
+database, then calls ``app.main.app`` through httpx's ASGI transport; no server
+or network is involved. Each endpoint gets a sequential pass that counts SQL
+statements per request, then a concurrent pass for latency percentiles and
+throughput. Results can be saved as JSON and compared with an earlier run:
+
+    python -m benchmarks.load --scale small --output before.json
+    python -m benchmarks.load --scale small --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from benchmarks import datagen
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    # (rng, fixture) -> (path, request kwargs); fixture holds ids and auth headers
+    build: Callable
+    write: bool = False
+
+
+def _skewed(rng, items):
+    # A few items get most of the traffic, like viral questions
+    return items[int(len(items) ** rng.random()) - 1]
+
+
+def _auth(rng, fixture):
+    return {"headers": rng.choice(fixture["auth_headers"])}
+
+
+ENDPOINTS = [
+    Endpoint("questions_list", "GET", lambda rng, f: ("/questions/?limit=20", {})),
+    Endpoint("questions_hot", "GET", lambda rng, f: ("/questions/hot?limit=30", {})),
+    Endpoint("questions_by_tag", "GET", lambda rng, f: (f"/questions/?limit=20&tag={rng.choice(datagen.TAGS)}", {})),
+    Endpoint("question_search", "GET", lambda rng, f: ("/questions/search", {"params": {"q": rng.choice(f["terms"])}})),
+    Endpoint("question_detail", "GET", lambda rng, f: (f"/questions/{_skewed(rng, f['question_ids'])}", {})),
+    Endpoint("answers_page", "GET", lambda rng, f: (f"/answers/question/{_skewed(rng, f['question_ids'])}?limit=20", {})),
+    Endpoint("comments_list", "GET", lambda rng, f: (f"/comments/answer/{_skewed(rng, f['answers'])[0]}", {})),
+    Endpoint("tags", "GET", lambda rng, f: ("/questions/tags", {})),
+    Endpoint("notifications_page", "GET", lambda rng, f: ("/notifications/?limit=20", _auth(rng, f))),
+    Endpoint("unread_count", "GET", lambda rng, f: ("/notifications/unread-count", _auth(rng, f))),
+    Endpoint("vote", "POST", lambda rng, f: _vote(rng, f), write=True),
+    Endpoint("comment_create", "POST", lambda rng, f: (
+        f"/comments/answer/{_skewed(rng, f['answers'])[0]}", {"json": {"content": "benchmark comment"}, **_auth(rng, f)}
+    ), write=True),
+    Endpoint("login", "POST", lambda rng, f: ("/auth/login", {"json": {
+        "email": f"user{rng.randint(1, f['users'])}@bench.local", "password": datagen.PASSWORD
+    }}), write=True),
+]
+
+
+def _vote(rng, fixture):
+    while True:
+        answer_id, owner_id = _skewed(rng, fixture["answers"])
+        user_id = rng.randint(1, fixture["users"])
+        if user_id != owner_id:
+            break
+    return "/votes/", {"json": {"answer_id": answer_id, "vote_type": rng.choice(["upvote", "downvote"])},
+                       "headers": fixture["headers_by_user"](user_id)}
+
+
+def _fixture(auth_users: int):
+    from jose import jwt
+    from app import models
+    from app.auth_utils import SECRET_KEY, ALGORITHM
+    from app.database import SessionLocal
+
+    def headers_by_user(user_id):
+        token = jwt.encode({"sub": f"user{user_id}@bench.local"}, SECRET_KEY, algorithm=ALGORITHM)
+        return {"Authorization": f"Bearer {token}"}
+
+    db = SessionLocal()
+    try:
+        question_ids = [question_id for (question_id,) in db.query(models.Question.id).order_by(models.Question.id.desc())]
+        answers = db.query(models.Answer.id, models.Answer.owner_id).order_by(models.Answer.id.desc()).all()
+        users = db.query(models.User).count()
+        titles = [title for (title,) in db.query(models.Question.title).limit(200)]
+    finally:
+        db.close()
+    return {
+        "users": users,
+        "question_ids": question_ids,
+        "answers": [tuple(answer) for answer in answers],
+        "terms": sorted({word.strip("?").lower() for title in titles for word in title.split()}),
+        "auth_headers": [headers_by_user(user_id) for user_id in range(1, min(auth_users, users) + 1)],
+        "headers_by_user": headers_by_user,
+    }
+
+
+def _percentile(sorted_ms, p):
+    return sorted_ms[min(len(sorted_ms) - 1, int(round(p / 100 * (len(sorted_ms) - 1))))]
+
+
+async def _run_endpoint(client, endpoint, fixture, counter, requests, concurrency, seed):
+    rng = random.Random(seed)
+    # Sequential pass: with one request in flight every statement belongs to it
+    sample = max(1, min(20, requests // 10))
+    before = counter.count
+    for _ in range(sample):
+        path, kwargs = endpoint.build(rng, fixture)
+        await client.request(endpoint.method, path, **kwargs)
+    queries = (counter.count - before) / sample
+
+    latencies, statuses = [], {}
+    calls = [endpoint.build(rng, fixture) for _ in range(requests)]
+    queue = iter(calls)
+
+    async def worker():
+        for path, kwargs in queue:
+            started = time.perf_counter()
+            response = await client.request(endpoint.method, path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(count for code, count in statuses.items() if code >= 500),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "queries_per_request": round(queries, 2),
+    }
+
+
+async def _drive(endpoints, fixture, requests, concurrency, seed):
+    import httpx
+    from app.database import QueryCounter
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        with QueryCounter() as counter:
+            for endpoint in endpoints:
+                # Seeded by position in ENDPOINTS, so a subset run replays the same requests
+                results[endpoint.name] = await _run_endpoint(
+                    client, endpoint, fixture, counter, requests, concurrency, seed + ENDPOINTS.index(endpoint)
+                )
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Print per-endpoint changes against ``baseline``; returns the names that regressed"""
+    regressed = []
+    print(f"\ncompared with {baseline['meta'].get('commit') or 'baseline'} (threshold {threshold:.0%})")
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        changes = []
+        worse = False
+        for key, higher_is_better in (("p50_ms", False), ("p95_ms", False), ("throughput_rps", True),
+                                      ("queries_per_request", False)):
+            if not previous[key]:
+                continue
+            change = current[key] / previous[key] - 1
+            changes.append(f"{key} {change:+.0%}")
+            worse |= (-change if higher_is_better else change) > threshold
+        if worse:
+            regressed.append(name)
+        print(f"{'REGRESSED ' if worse else ''}{name:20} " + "  ".join(changes))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(datagen.SCALES, key=lambda s: datagen.SCALES[s]), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoints", nargs="*", help=f"subset of: {' '.join(e.name for e in ENDPOINTS)}")
+    parser.add_argument("--read-only", action="store_true", help="skip endpoints that write")
+    parser.add_argument("--database-url", default=None, help="defaults to a fresh temporary SQLite file")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    # Run-to-run noise on a laptop is around 10% at the smaller scales
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    endpoints = [e for e in ENDPOINTS if (not args.endpoints or e.name in args.endpoints)
+                 and not (args.read_only and e.write)]
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    started = time.perf_counter()
+    counts = datagen.prepare(database_url, args.scale, args.seed)
+    print(f"generated {', '.join(f'{n} {t}' for t, n in counts.items())} in {time.perf_counter() - started:.1f}s")
+
+    fixture = _fixture(auth_users=50)
+    endpoint_results = asyncio.run(_drive(endpoints, fixture, args.requests, args.concurrency, args.seed))
+
+    from app import passwords
+    passwords.shutdown()
+
+    print(f"\n{'endpoint':20} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}  statuses")
+    for name, r in endpoint_results.items():
+        print(f"{name:20} {r['throughput_rps']:8.1f} {r['p50_ms']:7.2f}ms {r['p95_ms']:7.2f}ms "
+              f"{r['p99_ms']:7.2f}ms {r['queries_per_request']:8.2f}  {r['statuses']}")
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "rows": counts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "database": database_url.split(":", 1)[0],
+        },
+        "endpoints": endpoint_results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Measure login throughput, and latency of other requests during a login storm.
+
+"before" replays the old login (passlib bcrypt inline on the request thread); "after"
+is the shipped ``POST /auth/login`` with hashing on the worker pool. While the logins
+run, a probe client keeps hitting a cheap endpoint to show what queues behind them.
+Run from the backend directory:
+
+    python -m benchmarks.login_bench --clients 32 --logins 10 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def _setup(database_url, rounds):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+
+    from fastapi import Depends, HTTPException
+    from jose import jwt
+    from passlib.hash import bcrypt
+    from sqlalchemy.orm import Session
+    from app.main import app
+    from app import crud, schemas
+    from app.database import get_db
+    from app.auth_utils import SECRET_KEY, ALGORITHM
+
+    def legacy_login(form: schemas.UserLogin, db: Session = Depends(get_db)):
+        user = crud.get_user_by_email(db, form.email)
+        if not user or not bcrypt.verify(form.password, user.password):
+            raise HTTPException(status_code=400, detail="Invalid credentials")
+        return {"access_token": jwt.encode({"sub": user.email}, SECRET_KEY, algorithm=ALGORITHM),
+                "token_type": "bearer"}
+
+    app.add_api_route("/bench/legacy-login", legacy_login, methods=["POST"])
+    return app
+
+
+def _seed(users):
+    from app import crud, schemas
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        for i in range(users):
+            if not crud.get_user_by_email(db, f"login{i}@example.com"):
+                crud.create_user(db, schemas.UserCreate(
+                    username=f"login{i}", email=f"login{i}@example.com", password="benchmark-password"
+                ))
+    finally:
+        db.close()
+
+
+async def _drive(app, path, users, clients, logins_per_client):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        errors = 0
+        probe_ms = []
+        done = asyncio.Event()
+
+        async def worker(i):
+            nonlocal errors
+            body = {"email": f"login{i % users}@example.com", "password": "benchmark-password"}
+            for _ in range(logins_per_client):
+                response = await client.post(path, json=body)
+                errors += response.status_code != 200
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                probe_ms.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+    probe_ms.sort()
+    return {
+        "logins_per_s": (clients * logins_per_client - errors) / elapsed,
+        "errors": errors,
+        "probe_p50_ms": statistics.median(probe_ms),
+        "probe_p95_ms": probe_ms[int(len(probe_ms) * 0.95) - 1] if len(probe_ms) > 1 else probe_ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=10, help="logins per client")
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--variant", choices=["before", "after", "both"], default="both")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    app = _setup(database_url, args.rounds)
+    _seed(args.users)
+
+    from app import passwords
+
+    variants = {
+        "before": ("before (inline bcrypt)", "/bench/legacy-login"),
+        "after": (f"after ({passwords.PASSWORD_HASH_EXECUTOR} pool x{passwords.PASSWORD_HASH_WORKERS})", "/auth/login"),
+    }
+    for name in (["before", "after"] if args.variant == "both" else [args.variant]):
+        label, path = variants[name]
+        result = asyncio.run(_drive(app, path, args.users, args.clients, args.logins))
+        print(f"{label:28} {result['logins_per_s']:7.1f} logins/s  {result['errors']} errors  "
+              f"probe p50={result['probe_p50_ms']:.1f}ms p95={result['probe_p95_ms']:.1f}ms")
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark SearchIndex query latency over a synthetic corpus.
+
+Run from the backend directory:
+
+    python -m benchmarks.search_bench --docs 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.search import SearchIndex
+
+TAGS = ["python", "fastapi", "sqlalchemy", "react", "javascript", "docker", "mysql",
+        "sqlite", "css", "typescript", "node.js", "c++", "rust", "go", "java"]
+
+
+def _vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def build_index(n_docs, seed=42, vocab_size=50000):
+    rng = random.Random(seed)
+    vocab = _vocabulary(vocab_size, rng)
+
+    def words(k):
+        # Log-uniform ranks give a Zipf-like skew: a few words are very common, as in real text
+        return " ".join(vocab[int(vocab_size ** rng.random()) - 1] for _ in range(k))
+
+    index = SearchIndex()
+    index.loaded = True
+    for question_id in range(1, n_docs + 1):
+        title = words(8)
+        description = words(60)
+        tags = ",".join(rng.sample(TAGS, 3))
+        index.add_document(question_id, title, description, tags)
+    return index, vocab
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index, vocab = build_index(args.docs, seed=args.seed)
+    print(f"indexed {len(index)} questions in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(args.seed + 1)
+    # Mix of rare-term and common-term queries
+    queries = [" ".join(rng.sample(vocab[100:], 2) + rng.sample(vocab[:100], 1)) for _ in range(args.queries)]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=20)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"queries={len(timings)} p50={statistics.median(timings):.2f}ms "
+          f"p95={p95:.2f}ms max={timings[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare SQLite write throughput with and without the tuning profile and write queue.
+
+Each transaction has the shape of a vote: insert one row, then bump a shared tally
+with a relative UPDATE. Concurrent writer threads, alongside reader threads scanning the
+table, run against a fresh database file per variant:
+
+- "baseline": the old engine (rollback journal, driver defaults), threads write directly
+- "tuned": the SQLITE_PRAGMAS profile applied on connect, threads write directly
+- "tuned+queue": the profile plus the single-writer WriteQueue
+
+Run from the backend directory:
+
+    python -m benchmarks.sqlite_write_bench --threads 16 --writes 200 --readers 4
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, exc, func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+metadata = MetaData()
+tallies = Table("bench_tallies", metadata, Column("id", Integer, primary_key=True), Column("score", Integer))
+rows = Table(
+    "bench_rows", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("tally_id", Integer),
+    Column("payload", String(200)),
+)
+
+
+def _write(db, n):
+    db.execute(insert(rows).values(tally_id=n % 10, payload="x" * 120))
+    db.execute(update(tallies).where(tallies.c.id == n % 10).values(score=tallies.c.score + 1))
+
+
+def _engine(path, tuned):
+    from app.database import apply_sqlite_pragmas
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, pool_size=32)
+    if tuned:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(tallies), [{"id": i, "score": 0} for i in range(10)])
+    return engine
+
+
+def run_variant(name, threads, writes, readers):
+    from app.database import _create_writer_engine
+    from app.write_queue import WriteQueue
+
+    path = os.path.join(tempfile.mkdtemp(), f"{name.replace('+', '_')}.db")
+    engine = _engine(path, tuned=name != "baseline")
+    Session = sessionmaker(bind=engine)
+    queue = None
+    if name == "tuned+queue":
+        queue = WriteQueue(sessionmaker(bind=_create_writer_engine(f"sqlite:///{path}"), expire_on_commit=False))
+
+    errors = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(select(func.count(), func.max(rows.c.payload)).select_from(rows)).all()
+            except exc.OperationalError:
+                pass
+
+    def worker(offset):
+        nonlocal errors
+        for i in range(writes):
+            try:
+                if queue is not None:
+                    queue.run(_write, offset + i)
+                else:
+                    with Session() as db:
+                        _write(db, offset + i)
+                        db.commit()
+            except exc.OperationalError:
+                # "database is locked"
+                with lock:
+                    errors += 1
+
+    workers = [threading.Thread(target=worker, args=(t * writes,)) for t in range(threads)]
+    scanners = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in scanners:
+        thread.start()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in scanners:
+        thread.join()
+    if queue is not None:
+        queue.shutdown()
+    engine.dispose()
+    return (threads * writes - errors) / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=200, help="transactions per thread")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    parser.add_argument("--variant", choices=["baseline", "tuned", "tuned+queue", "all"], default="all")
+    args = parser.parse_args()
+
+    # app.database builds its engines at import; keep them off the real database file
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}")
+    variants = ["baseline", "tuned", "tuned+queue"] if args.variant == "all" else [args.variant]
+    for name in variants:
+        tps, errors = run_variant(name, args.threads, args.writes, args.readers)
+        print(f"{name:12} {tps:9.1f} commits/s  {errors} failed  ({args.threads} writers, {args.readers} readers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads its settings at import, so point it at a throwaway database first
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+# No background tasks issuing statements while a test counts them
+for name in ("HOT_REFRESH_INTERVAL", "UNREAD_RECONCILE_INTERVAL", "NOTIFICATION_RETENTION_INTERVAL",
+             "NOTIFICATION_COALESCE_WINDOW"):
+    os.environ[name] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def register(client):
+    def register(name):
+        response = client.post("/auth/register", json={
+            "username": name, "email": f"{name}@test.local", "password": "password"
+        })
+        assert response.status_code == 200, response.text
+        token = client.post("/auth/login", json={
+            "email": f"{name}@test.local", "password": "password"
+        }).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return register
+
+
+@pytest.fixture
+def queries():
+    with database.QueryCounter() as counter:
+        yield counter
@@ -0,0 +1,72 @@
+"""Statement budgets for the thread read endpoints.
+
+Each endpoint must load its nested answers and comments with a fixed number of
+statements, whatever the size of the thread. The budgets are for a cold thread
+cache; a cached read may only issue fewer.
+"""
+import pytest
+
+from app.thread_cache import thread_cache
+
+BUDGETS = {
+    "question": 2,  # question row, answers
+    "answers_page": 3,  # thread version, answer page, comments
+    "answer": 2,  # answer, comments
+}
+
+
+@pytest.fixture(scope="module")
+def threads(client, register):
+    """One question per (answers, comments per answer) shape; returns {shape: (question_id, answer_id)}"""
+    asker, answerer, commenter = register("asker"), register("answerer"), register("commenter")
+    threads = {}
+    for answers, comments in [(1, 1), (10, 5)]:
+        question_id = client.post("/questions/", json={
+            "title": f"Thread with {answers} answers", "description": "query budget", "tags": "python"
+        }, headers=asker).json()["id"]
+        for i in range(answers):
+            answer_id = client.post(f"/answers/question/{question_id}", json={"content": f"answer {i}"},
+                                    headers=answerer).json()["id"]
+            for j in range(comments):
+                response = client.post(f"/comments/answer/{answer_id}", json={"content": f"comment {j}"},
+                                       headers=commenter)
+                assert response.status_code == 200, response.text
+        threads[(answers, comments)] = (question_id, answer_id)
+    return threads
+
+
+def _paths(question_id, answer_id):
+    return {
+        "question": f"/questions/{question_id}",
+        "answers_page": f"/answers/question/{question_id}",
+        "answer": f"/answers/{answer_id}",
+    }
+
+
+def _count(client, queries, path):
+    before = queries.count
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return queries.count - before
+
+
+@pytest.mark.parametrize("endpoint", sorted(BUDGETS))
+def test_statements_within_budget(client, threads, queries, endpoint):
+    counts = {}
+    for shape, (question_id, answer_id) in threads.items():
+        path = _paths(question_id, answer_id)[endpoint]
+        thread_cache.backend.clear()
+        cold = _count(client, queries, path)
+        warm = _count(client, queries, path)
+        assert cold <= BUDGETS[endpoint], f"{path}: {cold} statements\n" + "\n".join(queries.statements[-cold:])
+        assert warm <= cold, path
+        counts[shape] = cold
+    # A larger thread must not cost more statements
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_answers_page_returns_whole_thread(client, threads):
+    question_id, _ = threads[(10, 5)]
+    page = client.get(f"/answers/question/{question_id}").json()
+    assert len(page["items"]) == 10
+    assert all(len(answer["comments"]) == 5 for answer in page["items"])
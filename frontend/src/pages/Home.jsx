@@ -11,7 +11,7 @@ export default function Home() {
     const fetchQuestions = async () => {
       try {
         const response = await axios.get("/questions/");
-        setQuestions(response.data);
+        setQuestions(response.data.items);
       } catch (error) {
         console.error('Error fetching questions:', error);
         toast.error('Failed to load questions');